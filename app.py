@@ -1,25 +1,45 @@
-from flask import Flask, render_template
+import os
+
+from flask import Flask, jsonify, render_template, request
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
 from werkzeug.serving import run_simple
 
-# Visualizations
-# Maps
-from charts.python.maps.dash_co2map import server as dash_co2_server
-from charts.python.maps.dash_forestmap import server as dash_forest_server
-from charts.python.maps.dash_airquality import server as dash_aqi_server
-from charts.python.maps.dash_temperaturemap import server as dash_temperature_server
+from charts.python.common.lazy_dispatch import LazyMounts, LAZY_MOUNTS, PREWARM_MOUNTS
+from charts.python.common.instrumentation import instrument_server, metrics
+from charts.python.common.figure_cache import figure_cache
+from charts.python.common.cache_backends import MemoryBackend
+from charts.python.common.coalesce import coalescer
+from charts.python.common.http_cache import ResponseCache, RESPONSE_CACHE
+from charts.python.common.registry import data_version
+from charts.python.common.hot_reload import DatasetWatcher, HOT_RELOAD
+
+# Dashboard stat cards
+from charts.python.dashboard.stats_service import stats_service
+
+# Visualizations, imported on the first request to their prefix
+MOUNTS = {
+    # Correlation Heatmaps
+    "/dash": "charts.python.heatmaps.dash_correlation_pollution",
+    "/climate": "charts.python.heatmaps.dash_correlation_climate_change",
+
+    # Maps
+    "/co2": "charts.python.maps.dash_co2map",
+    "/forest": "charts.python.maps.dash_forestmap",
+    "/aqi": "charts.python.maps.dash_airquality",
+    "/temperature": "charts.python.maps.dash_temperaturemap",
 
-# Heat Maps
-from charts.python.heatmaps.dash_correlation_pollution import server as dash_correlation_polution_server
-from charts.python.heatmaps.dash_correlation_climate_change import server as dash_correlation_climate_change_server
+    # Bar Charts
+    "/weather-events": "charts.python.timeseriescharts.dash_weather_server",
 
-#Bar Chart
-from charts.python.timeseriescharts.dash_weather_server import server as dash_weather_server
+    # Line Graph
+    "/plastic-waste": "charts.python.timeseriescharts.dash_plastic_waste",
 
-# Line Graph
-from charts.python.timeseriescharts.dash_plastic_waste import server as dash_plastic_server
+    # Bubble Chart
+    "/population": "charts.python.timeseriescharts.dash_population"
+}
 
 app = Flask(__name__)
+instrument_server(app, 'main')
 
 @app.route('/')
 def home():
@@ -31,7 +51,17 @@ def analytics():
 
 @app.route('/dashboard')
 def dashboard():
-    return render_template('dashboard.html')
+    _, last_modified = stats_service.version()
+    return render_template('dashboard.html', stats=stats_service.get(), last_modified=last_modified)
+
+@app.route('/api/stats')
+def stats():
+    etag, last_modified = stats_service.version()
+    response = jsonify(stats_service.get())
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/datasets')
 def datasets():
@@ -41,24 +71,65 @@ def datasets():
 def worldmap():
     return render_template('worldmap.html')
 
+@app.route('/api/mounts')
+def mounts_report():
+    return jsonify({
+        prefix: {'loaded': mounts.loaded(prefix), 'seconds': mounts.timings.get(prefix)}
+        for prefix in mounts
+    })
+
+@app.route('/api/reloads')
+def reloads_report():
+    return jsonify({'reloads': watcher.reloads, 'failures': watcher.failures, 'last': watcher.last})
+
+@app.route('/metrics')
+def metrics_report():
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # Mount Dash under /dash
-application = DispatcherMiddleware(app, {
-    # Correlation Heatmaps
-    "/dash": dash_correlation_polution_server,
-    "/climate": dash_correlation_climate_change_server,
-    
-    # Maps
-    "/co2": dash_co2_server,
-    "/forest": dash_forest_server,
-    "/aqi": dash_aqi_server,
-    "/temperature": dash_temperature_server,
-    
-    # Bar Charts
-    "/weather-events": dash_weather_server,
-    
-    # Line Graph
-    "/plastic-waste": dash_plastic_server
-})
+mounts = LazyMounts(MOUNTS, on_load=lambda server, prefix: instrument_server(server, prefix.strip('/')))
+if not LAZY_MOUNTS:
+    mounts.prewarm(background=False)
+elif PREWARM_MOUNTS:
+    mounts.prewarm()
+
+application = DispatcherMiddleware(app, mounts)
+# Compresses every response; caches layouts and callback results
+response_cache = ResponseCache(application, version=data_version)
+if RESPONSE_CACHE:
+    application = response_cache
+
+def drop_stale_caches(names):
+    # Entries keyed on the previous data version can no longer be hit. The
+    # disk and shared-memory figure stores are shared by every worker, and
+    # each worker reloads on its own, so clearing them here would drop the
+    # figures the other workers already built from the new data; their stale
+    # keys are evicted under the byte budget instead.
+    if isinstance(figure_cache.backend, MemoryBackend):
+        figure_cache.invalidate()
+    response_cache.clear()
+
+# Re-ingests changed dataset files and swaps the rebuilt apps in. Only
+# serving processes start it: the dev server's child below and every
+# gunicorn worker (gunicorn.conf.py), never a plain import.
+watcher = DatasetWatcher(mounts, on_reload=drop_stale_caches)
+
+metrics.gauge('figure_cache_bytes', 'Bytes held by the figure cache.', lambda: figure_cache.stats()['bytes'])
+metrics.gauge('figure_cache_hits_total', 'Figure cache hits.', lambda: figure_cache.stats()['hits'])
+metrics.gauge('figure_cache_misses_total', 'Figure cache misses.', lambda: figure_cache.stats()['misses'])
+metrics.gauge('figure_cache_dropped_total', 'Figures too large for the cache and not stored.',
+              lambda: figure_cache.stats()['dropped'])
+metrics.gauge('callbacks_skipped_total', 'Superseded callback requests skipped.', lambda: coalescer.stats()['skipped'])
+metrics.gauge('response_cache_hits_total', 'Responses served from the response cache.', lambda: response_cache.stats()['hits'])
+metrics.gauge('response_cache_not_modified_total', '304 responses sent.', lambda: response_cache.stats()['not_modified'])
+metrics.gauge('response_cache_bytes', 'Bytes held by the response cache.', lambda: response_cache.stats()['bytes'])
+metrics.gauge('response_bytes_saved_total', 'Bytes saved by compression.',
+              lambda: response_cache.stats()['bytes_in'] - response_cache.stats()['bytes_out'])
+metrics.gauge('dataset_reloads_total', 'Dataset reloads applied without a restart.', lambda: watcher.reloads)
+metrics.gauge('mounts_loaded', 'Dash apps imported so far.', lambda: sum(map(mounts.loaded, mounts)))
 
 if __name__ == "__main__":
+    # The reloader parent only restarts the child on code changes
+    if HOT_RELOAD and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        watcher.start()
     run_simple("localhost", 5000, application, use_reloader=True, use_debugger=True)
@@ -0,0 +1,90 @@
+# Latency of every callback across all of its slider positions.
+
+import importlib
+
+import pytest
+
+from conftest import run_positions
+from charts.python.common.figure_cache import figure_cache
+
+MAPS = {
+    'co2': 'charts.python.maps.dash_co2map',
+    'forest': 'charts.python.maps.dash_forestmap',
+    'temperature': 'charts.python.maps.dash_temperaturemap',
+    'aqi': 'charts.python.maps.dash_airquality',
+}
+
+
+def callback(module, name):
+    # @app.callback wraps the function; benchmark the function itself
+    func = getattr(module, name)
+    return getattr(func, '__wrapped__', func)
+
+
+def map_positions(name, module):
+    if name == 'aqi':
+        return range(len(module.unique_dates))
+    return range(module.min_year, module.max_year + 1)
+
+
+@pytest.mark.parametrize('cached', [False, True], ids=['build', 'cached'])
+@pytest.mark.parametrize('name', list(MAPS))
+def bench_update_map(benchmark, name, cached):
+    module = importlib.import_module(MAPS[name])
+    positions = map_positions(name, module)
+    if cached:
+        figure_cache.invalidate()
+        figure_cache.warm(name, positions, module.build_figure, background=False)
+        setup = None
+    else:
+        setup = lambda: figure_cache.invalidate(name)
+    run_positions(benchmark, module.update_map, positions, setup)
+
+
+@pytest.mark.parametrize('cached', [False, True], ids=['build', 'cached'])
+def bench_update_population(benchmark, cached):
+    module = importlib.import_module('charts.python.timeseriescharts.dash_population')
+    if cached:
+        figure_cache.invalidate()
+        figure_cache.warm('population', module.years, module.build_figure, background=False)
+        setup = None
+    else:
+        setup = lambda: figure_cache.invalidate('population')
+    run_positions(benchmark, callback(module, 'update_chart'), module.years, setup)
+
+
+@pytest.mark.parametrize('module_name', [
+    'charts.python.heatmaps.dash_correlation_pollution',
+    'charts.python.heatmaps.dash_correlation_climate_change',
+])
+def bench_update_heatmap(benchmark, module_name):
+    module = importlib.import_module(module_name)
+    years = [int(year) for year in module.store.keys]
+    # Every start year with the full range to the end, plus single years
+    ranges = [[start, years[-1]] for start in years] + [[year, year] for year in years]
+    run_positions(benchmark, callback(module, 'update_heatmap'), ranges, figure_cache.invalidate)
+
+
+def bench_update_weather(benchmark):
+    module = importlib.import_module('charts.python.timeseriescharts.dash_weather_server')
+    selections = [None] + [[country] for country in sorted(module.countries)]
+    run_positions(benchmark, callback(module, 'update_graph'), selections, figure_cache.invalidate)
+
+
+def bench_update_plastic(benchmark):
+    module = importlib.import_module('charts.python.timeseriescharts.dash_plastic_waste')
+    run_positions(benchmark, callback(module, 'update_graph'), sorted(module.countries),
+                  figure_cache.invalidate)
+
+
+def bench_zoom_plastic(benchmark):
+    module = importlib.import_module('charts.python.timeseriescharts.dash_plastic_waste')
+    country = sorted(module.countries)[0]
+    dates = module.store.slice(country)['Date']
+    # Windows shrinking from the whole series to its last tenth
+    windows = [
+        {'xaxis.range[0]': str(dates.iloc[int(len(dates) * share)]), 'xaxis.range[1]': str(dates.iloc[-1])}
+        for share in (0, 0.25, 0.5, 0.75, 0.9)
+    ]
+    zoom = callback(module, 'zoom_graph')
+    run_positions(benchmark, lambda relayout: zoom(relayout, country), windows)
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from conftest import ROUNDS
+from charts.python.timeseriescharts.bubble_chart import BubbleChart
+
+
+def population_areas(n, seed=0):
+    # Country populations are roughly log-normal; areas are in millions
+    return np.random.default_rng(seed).lognormal(mean=2.5, sigma=1.5, size=n)
+
+
+@pytest.mark.parametrize('n', [30, 100, 250])
+def bench_collapse(benchmark, n):
+    area = population_areas(n)
+
+    def setup():
+        return (BubbleChart(area=area, bubble_spacing=0.1),), {}
+
+    benchmark.pedantic(lambda chart: chart.collapse(), setup=setup, rounds=ROUNDS, iterations=1)
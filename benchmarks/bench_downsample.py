@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from conftest import ROUNDS
+from charts.python.common.downsample import MAX_POINTS, downsample
+
+
+def daily_series(n, seed=0):
+    # A noisy seasonal daily feed with a few missing days
+    x = np.arange(n, dtype=np.float64) * 86_400_000
+    y = 3000 + 500 * np.sin(np.arange(n) / 58) + np.random.default_rng(seed).normal(0, 80, n)
+    y[::97] = np.nan
+    return x, y
+
+
+@pytest.mark.parametrize('n', [10_000, 100_000, 1_000_000])
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def bench_downsample(benchmark, method, n):
+    x, y = daily_series(n)
+    benchmark.pedantic(downsample, args=(x, y, MAX_POINTS, method), rounds=ROUNDS, iterations=1)
@@ -0,0 +1,45 @@
+# Cold import time of every chart module, each in a fresh interpreter.
+
+import glob
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import IMPORTS, ROOT, ROUNDS
+
+# Blocking Matplotlib window, not importable headless
+SKIP = {'charts.python.timeseriescharts.population'}
+
+MODULES = sorted(
+    path[:-3].replace(os.sep, '.')
+    for path in glob.glob(os.path.join('charts', 'python', '**', '*.py'), recursive=True, root_dir=ROOT)
+)
+
+IMPORT_SCRIPT = """
+import json, os, sys, time
+sys.path[:0] = [{root!r}, {benchmarks!r}]
+os.chdir({root!r})
+scale = int(os.environ.get('BENCH_SCALE', 1))
+if scale > 1:
+    from synthetic import use_scaled_datasets
+    use_scaled_datasets(scale)
+start = time.perf_counter()
+import {module}
+print(json.dumps(time.perf_counter() - start))
+"""
+
+
+def import_seconds(module):
+    script = IMPORT_SCRIPT.format(root=ROOT, benchmarks=os.path.join(ROOT, 'benchmarks'), module=module)
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize('module', [m for m in MODULES if m not in SKIP])
+def bench_cold_import(benchmark, module):
+    timings = []
+    benchmark.pedantic(lambda: timings.append(import_seconds(module)), rounds=ROUNDS, iterations=1)
+    benchmark.extra_info['import_ms'] = IMPORTS[module] = round(sorted(timings)[len(timings) // 2] * 1000, 3)
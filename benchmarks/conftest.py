@@ -0,0 +1,83 @@
+# benchmarks/conftest.py
+#
+#   python -m pytest benchmarks                      # real datasets
+#   python -m pytest benchmarks --bench-scale 10     # 10x synthetic copies
+#   python -m pytest benchmarks --benchmark-autosave
+#   python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=median:20%
+
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Dataset paths are relative to the repository root
+os.chdir(ROOT)
+
+ROUNDS = int(os.environ.get('BENCH_ROUNDS', 3))
+
+# Per-call latency percentiles and import times, printed after the benchmark table
+LATENCIES = {}
+IMPORTS = {}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--bench-scale', type=int, default=int(os.environ.get('BENCH_SCALE', 1)),
+        help='Run against N-times synthetic copies of every dataset.'
+    )
+
+
+def pytest_configure(config):
+    scale = config.getoption('--bench-scale')
+    # Inherited by the cold-import subprocesses
+    os.environ['BENCH_SCALE'] = str(scale)
+    if scale > 1:
+        from synthetic import use_scaled_datasets
+        use_scaled_datasets(scale)
+
+
+def run_positions(benchmark, func, positions, setup=None):
+    """
+    Benchmark one full sweep of ``func`` over every slider position and
+    record the per-call p50/p99 latency in the benchmark's extra info.
+    ``setup`` runs untimed before each call (e.g. to clear a cache).
+    """
+    positions = list(positions)
+    latencies = []
+
+    def sweep():
+        for position in positions:
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func(position)
+            latencies.append(time.perf_counter() - start)
+
+    benchmark.pedantic(sweep, rounds=ROUNDS, iterations=1)
+    benchmark.extra_info.update({
+        'positions': len(positions),
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3),
+        'p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 3),
+        'max_ms': round(max(latencies) * 1000, 3)
+    })
+    LATENCIES[benchmark.name] = benchmark.extra_info
+
+
+def pytest_terminal_summary(terminalreporter):
+    if IMPORTS:
+        terminalreporter.section('cold import, excluding interpreter startup (ms)')
+        width = max(map(len, IMPORTS))
+        for module, ms in sorted(IMPORTS.items(), key=lambda item: item[1], reverse=True):
+            terminalreporter.write_line(f"{module:<{width}}  {ms:>9.1f}")
+    if not LATENCIES:
+        return
+    terminalreporter.section('per-call latency (ms)')
+    width = max(map(len, LATENCIES))
+    terminalreporter.write_line(f"{'callback':<{width}}  positions      p50      p99      max")
+    for name, info in sorted(LATENCIES.items()):
+        terminalreporter.write_line(
+            f"{name:<{width}}  {info['positions']:>9}  {info['p50_ms']:>7.2f}  {info['p99_ms']:>7.2f}  {info['max_ms']:>7.2f}"
+        )
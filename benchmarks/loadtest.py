@@ -0,0 +1,309 @@
+# benchmarks/loadtest.py
+#
+#   python benchmarks/loadtest.py --users 16 --duration 30
+#   python benchmarks/loadtest.py --url http://127.0.0.1:8000 --users 64 --mix page=1,drag=3
+#
+# Replays page-view and slider-drag sessions the way the Dash renderer
+# issues them and reports throughput, latency and errors per mount.
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Flask page -> Dash apps it embeds as iframes
+PAGES = {
+    '/worldmap': ['/co2', '/forest', '/aqi', '/temperature'],
+    '/analytics': ['/dash', '/climate'],
+    '/dashboard': ['/weather-events', '/plastic-waste', '/population'],
+}
+THROTTLED_SUFFIX = '-throttled'
+# Store the browser fills with a per-page id; superseded requests of one page are skipped
+PAGE_ID = 'page-id'
+SLIDER_MOUNTS = ['/co2', '/forest', '/aqi', '/temperature', '/dash', '/climate', '/population']
+
+
+class InProcessTransport:
+    def __init__(self, application):
+        """Calls the WSGI ``application`` directly on the caller's thread."""
+        from werkzeug.test import Client
+        self.client = Client(application)
+
+    def request(self, method, path, body=None):
+        if method == 'POST':
+            response = self.client.post(path, data=body, content_type='application/json')
+        else:
+            response = self.client.get(path)
+        return response.status_code, response.get_data()
+
+
+class HttpTransport:
+    def __init__(self, url):
+        """One keep-alive connection per virtual user."""
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.connection = None
+
+    def request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+
+class Recorder:
+    def __init__(self):
+        """Latency, size and error samples per mount."""
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.bytes = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, mount, seconds, size, ok):
+        with self._lock:
+            self.samples[mount].append(seconds)
+            self.bytes[mount] += size
+            if not ok:
+                self.errors[mount] += 1
+
+    def report(self, elapsed):
+        rows = []
+        for mount in sorted(self.samples):
+            latencies = np.array(self.samples[mount]) * 1000
+            rows.append((mount, latencies, self.errors[mount], self.bytes[mount]))
+        total = np.concatenate([row[1] for row in rows]) if rows else np.array([0.0])
+        rows.append(('TOTAL', total, sum(self.errors.values()), sum(self.bytes.values())))
+
+        lines = [f"{'mount':<16}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+                 f"{'p99 ms':>9}{'max ms':>9}{'errors':>8}{'MB':>8}"]
+        for mount, latencies, errors, size in rows:
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            lines.append(
+                f"{mount:<16}{len(latencies):>9}{len(latencies) / elapsed:>9.1f}{p50:>9.1f}{p95:>9.1f}"
+                f"{p99:>9.1f}{latencies.max():>9.1f}{errors / max(len(latencies), 1):>8.1%}{size / 1e6:>8.1f}"
+            )
+        return '\n'.join(lines)
+
+
+def _components(node, found):
+    # Walk a Dash layout and collect {id: props} of every component
+    if isinstance(node, list):
+        for child in node:
+            _components(child, found)
+    elif isinstance(node, dict):
+        props = node.get('props', {})
+        if 'id' in props and isinstance(props['id'], str):
+            found[props['id']] = props
+        _components(props.get('children'), found)
+    return found
+
+
+class MountSpec:
+    def __init__(self, layout, dependencies):
+        """Server-side callbacks of one Dash app and its initial prop values."""
+        self.props = _components(layout, {})
+        self.callbacks = [dep for dep in dependencies if not dep.get('clientside_function')]
+
+    def _values(self, deps, values):
+        # Overridden value, else the prop's value in the initial layout
+        found = []
+        for dep in deps:
+            key = f"{dep['id']}.{dep['property']}"
+            value = values.get(key, self.props.get(dep['id'], {}).get(dep['property']))
+            found.append({'id': dep['id'], 'property': dep['property'], 'value': value})
+        return found
+
+    def body(self, callback, values=None, page=None, changed=None):
+        values = values or {}
+        # Multi-output callbacks are named '..id.prop...id.prop..'
+        outputs = [
+            dict(zip(('id', 'property'), output.rsplit('.', 1)))
+            for output in callback['output'].strip('.').split('...')
+        ]
+        return json.dumps({
+            'output': callback['output'],
+            'outputs': outputs if callback['output'].startswith('..') else outputs[0],
+            'inputs': self._values(callback['inputs'], values),
+            'changedPropIds': list(values) if changed is None else changed,
+            'state': self._values(callback.get('state', []), {**values, f'{PAGE_ID}.data': page})
+        })
+
+    def sliders(self, props=None):
+        """(callback, input key, positions, is range) of every slider-driven callback."""
+        props = props or {}
+        found = []
+        for callback in self.callbacks:
+            for dep in callback['inputs']:
+                # Throttled sliders reach the server through a dcc.Store
+                slider_id = dep['id'].removesuffix(THROTTLED_SUFFIX)
+                slider = {**self.props.get(slider_id, {}), **props.get(slider_id, {})}
+                if 'min' in slider and 'max' in slider and dep['property'] in ('value', 'data'):
+                    step = slider.get('step') or 1
+                    positions = np.arange(slider['min'], slider['max'] + step / 2, step).tolist()
+                    found.append((callback, f"{dep['id']}.{dep['property']}", positions,
+                                  isinstance(slider['value'], list)))
+                    break
+        return found
+
+    def choices(self, callback, rng):
+        """A random option for every input of ``callback`` picked from a list (e.g. a mode)."""
+        picks = {}
+        for dep in callback['inputs']:
+            options = self.props.get(dep['id'], {}).get('options')
+            if options and dep['property'] == 'value':
+                value = rng.choice(options)
+                picks[f"{dep['id']}.{dep['property']}"] = value['value'] if isinstance(value, dict) else value
+        return picks
+
+    def triggered(self, keys):
+        """Callbacks the browser fires when the props ``keys`` change."""
+        return [
+            callback for callback in self.callbacks
+            if any(f"{dep['id']}.{dep['property']}" in keys for dep in callback['inputs'])
+        ]
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, transport, recorder, specs, mix, think, deadline, seed):
+        super().__init__(daemon=True)
+        self.transport = transport
+        self.recorder = recorder
+        self.specs = specs
+        self.mix = mix
+        self.think = think
+        self.deadline = deadline
+        self.random = random.Random(seed)
+        self.page = self.new_page()
+
+    def new_page(self):
+        return f'{self.random.getrandbits(96):024x}'
+
+    def call(self, mount, method, path, body=None):
+        start = time.perf_counter()
+        data = None
+        try:
+            status, data = self.transport.request(method, path, body)
+            ok, size = status < 400, len(data)
+        except Exception:
+            ok, size = False, 0
+        self.recorder.record(mount, time.perf_counter() - start, size, ok)
+        return data if ok else None
+
+    def page_view(self):
+        page = self.random.choice(list(PAGES))
+        self.page = self.new_page()
+        self.call('main', 'GET', page)
+        for mount in PAGES[page]:
+            self.call(mount, 'GET', f'{mount}/')
+            self.call(mount, 'GET', f'{mount}/_dash-layout')
+            self.call(mount, 'GET', f'{mount}/_dash-dependencies')
+            for callback in self.specs[mount].callbacks:
+                # The browser does not fire these on load (e.g. the plastic-waste zoom)
+                if callback.get('prevent_initial_call'):
+                    continue
+                self.call(mount, 'POST', f'{mount}/_dash-update-component', self.specs[mount].body(callback, page=self.page))
+
+    def slider_drag(self):
+        mount = self.random.choice([m for m in SLIDER_MOUNTS if self.specs[m].sliders()])
+        spec = self.specs[mount]
+        callback, key, _, _ = self.random.choice(spec.sliders())
+        # Switch the slider's other inputs (e.g. resolution, mode) first, as
+        # a user would, and let the callbacks that fires reshape the slider
+        picks = spec.choices(callback, self.random)
+        props = {}
+        for dependent in spec.triggered(picks):
+            if dependent is callback:
+                continue
+            data = self.call(mount, 'POST', f'{mount}/_dash-update-component',
+                             spec.body(dependent, picks, self.page))
+            if data:
+                for component, updated in json.loads(data).get('response', {}).items():
+                    props.setdefault(component, {}).update(updated)
+        _, key, positions, is_range = next(s for s in spec.sliders(props) if s[0] is callback)
+        start = self.random.randrange(len(positions))
+        direction = self.random.choice([-1, 1])
+        for i in range(self.random.randint(3, 12)):
+            pos = min(max(start + direction * i, 0), len(positions) - 1)
+            value = [positions[0], positions[pos]] if is_range else positions[pos]
+            body = spec.body(callback, {**picks, key: value}, self.page, changed=[key])
+            self.call(mount, 'POST', f'{mount}/_dash-update-component', body)
+            if self.think:
+                time.sleep(self.think / 4)
+
+    def run(self):
+        sessions, weights = zip(*self.mix.items())
+        while time.monotonic() < self.deadline:
+            session = self.random.choices(sessions, weights)[0]
+            self.page_view() if session == 'page' else self.slider_drag()
+            if self.think:
+                time.sleep(self.random.expovariate(1 / self.think))
+
+
+def load_specs(transport):
+    """Fetch every mount's layout and callbacks once; also warms lazy mounts."""
+    specs = {}
+    for mount in sorted({m for mounts in PAGES.values() for m in mounts}):
+        _, layout = transport.request('GET', f'{mount}/_dash-layout')
+        _, dependencies = transport.request('GET', f'{mount}/_dash-dependencies')
+        specs[mount] = MountSpec(json.loads(layout), json.loads(dependencies))
+    return specs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay dashboard sessions against the app.')
+    parser.add_argument('--url', help='Server to load; default runs application in-process.')
+    parser.add_argument('--users', type=int, default=8, help='Concurrent virtual users.')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run.')
+    parser.add_argument('--mix', default='page=1,drag=2', help='Session weights, e.g. page=1,drag=2.')
+    parser.add_argument('--think', type=float, default=0.0, help='Mean pause between sessions (s).')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.url:
+        make_transport = lambda: HttpTransport(args.url)
+    else:
+        sys.path.insert(0, ROOT)
+        os.chdir(ROOT)
+        from app import application
+        make_transport = lambda: InProcessTransport(application)
+
+    mix = {name: float(weight) for name, weight in (item.split('=') for item in args.mix.split(','))}
+    specs = load_specs(make_transport())
+
+    recorder = Recorder()
+    start = time.monotonic()
+    deadline = start + args.duration
+    users = [
+        VirtualUser(make_transport(), recorder, specs, mix, args.think, deadline, args.seed + i)
+        for i in range(args.users)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+
+    print(f"{args.users} users, {args.duration:.0f}s, mix {args.mix}")
+    print(recorder.report(time.monotonic() - start))
+
+
+if __name__ == '__main__':
+    main()
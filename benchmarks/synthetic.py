@@ -0,0 +1,73 @@
+# benchmarks/synthetic.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from charts.python.common import binary_cache, registry
+
+# Columns that name a country; copies get a " #k" suffix so they stay distinct.
+# Codes are kept so the copies still resolve to ISO-3 and stay on the maps.
+ENTITY_COLUMNS = ('Entity', 'Country')
+
+
+def _date_format(kwargs):
+    # Written back in the format the loader parses the column with
+    return kwargs.get('format') or ('%d/%m/%Y' if kwargs.get('dayfirst') else '%Y-%m-%d')
+
+
+def scaled_frame(df, scale, dates=None):
+    """
+    ``scale`` copies of ``df`` (read as text). With ``dates`` (a column
+    mapped to its pd.to_datetime keywords) each copy moves every row back
+    by the span of that column, so each country's series is ``scale``
+    times longer; otherwise copies get renamed countries.
+    """
+    if dates:
+        col, kwargs = next(iter(dates.items()))
+        parsed = pd.to_datetime(df[col], **kwargs)
+        span = parsed.max() - parsed.min() + pd.Timedelta(days=1)
+        fmt = _date_format(kwargs)
+    copies = [df]
+    for k in range(1, scale):
+        copy = df.copy()
+        if dates:
+            # Rows the loader cannot parse stay as they are
+            copy[col] = np.where(parsed.notna(), (parsed - span * k).dt.strftime(fmt), df[col])
+        else:
+            for col in ENTITY_COLUMNS:
+                if col in copy.columns:
+                    values = copy[col].to_numpy(dtype=object)
+                    copy[col] = np.where(values != '', values + f' #{k}', values)
+        copies.append(copy)
+    # Oldest copy first, so dated rows stay in date order
+    return pd.concat(copies[::-1] if dates else copies, ignore_index=True)
+
+
+def use_scaled_datasets(scale, directory=None):
+    """
+    Point the dataset registry at ``scale``x copies of every dataset.
+    Must run before any chart module is imported. The copies (and their
+    binary cache) are written once under ``directory`` and reused.
+
+    Daily feeds are extended back in time, so the time-series charts draw
+    longer series; a feed read through a fixed date window (AQI) and the
+    yearly datasets get more countries instead.
+    """
+    directory = directory or os.path.join(binary_cache.CACHE_DIR, f'synthetic-{scale}x')
+    os.makedirs(directory, exist_ok=True)
+    for spec in registry.DATASETS.values():
+        source = spec['path']
+        types = binary_cache.DATASET_TYPES.get(source, {})
+        dates = None if types.get('stream', {}).get('window') else types.get('dates')
+        layout = 'longer' if dates else 'wider'
+        target = os.path.join(directory, f'{binary_cache.file_hash(source)[:8]}-{layout}-{os.path.basename(source)}')
+        if not os.path.exists(target):
+            df = pd.read_csv(source, dtype=str, keep_default_na=False)
+            tmp = f'{target}.tmp-{os.getpid()}'
+            scaled_frame(df, scale, dates).to_csv(tmp, index=False)
+            os.replace(tmp, target)
+        binary_cache.DATASET_TYPES[target] = types
+        spec['path'] = target
+    binary_cache.CACHE_DIR = os.path.join(directory, 'cache')
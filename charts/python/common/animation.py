@@ -0,0 +1,95 @@
+# charts/python/common/animation.py
+
+import os
+
+from dash import Input, Output, dcc, html
+from dash.exceptions import PreventUpdate
+
+from charts.python.common.coalesce import PAGE_STATE, coalesced, install_page_id
+from charts.python.common.figure_cache import figure_cache
+
+# === Config ===
+FRAME_DURATION_MS = int(os.environ.get('FRAME_DURATION_MS', 300))
+# Years shown in play mode before the user picks a range.
+DEFAULT_PLAY_YEARS = 30
+
+MODE_ID = 'map-mode'
+PLAY_RANGE_ID = 'play-range'
+PLAY_GRAPH_ID = 'play-map'
+PLAY_CONTROLS_ID = 'play-controls'
+
+TOGGLE_JS = """
+function(mode) {
+    var hidden = {display: 'none'};
+    return mode === 'play' ? [hidden, hidden, {}, {}] : [{}, {}, hidden, hidden];
+}
+"""
+
+
+def mode_toggle():
+    return dcc.RadioItems(
+        id=MODE_ID,
+        options=[{'label': ' Single year', 'value': 'single'}, {'label': ' Play years', 'value': 'play'}],
+        value='single',
+        inline=True,
+        inputStyle={'marginLeft': '12px'},
+        style={'textAlign': 'center', 'marginBottom': '10px'}
+    )
+
+
+def play_controls(min_year, max_year):
+    return html.Div([
+        dcc.RangeSlider(
+            id=PLAY_RANGE_ID,
+            min=min_year,
+            max=max_year,
+            value=[max(min_year, max_year - DEFAULT_PLAY_YEARS), max_year],
+            marks=None,
+            step=1,
+            tooltip={"placement": "bottom", "always_visible": True}
+        )
+    ], id=PLAY_CONTROLS_ID, className='slider-container', style={'display': 'none'})
+
+
+def register_play_mode(app, name, store, template, map_title, year_controls_id, graph_id):
+    """
+    Add a play mode to a year-slider map: the layout gets a mode toggle, a
+    year-range slider and a second graph holding one animated figure for
+    the whole range, built in a single pass by ``template.render_frames``.
+    """
+    install_page_id(app)
+    children = app.layout.children
+    children.insert(1, mode_toggle())
+    min_year, max_year = int(store.keys[0]), int(store.keys[-1])
+    children.append(play_controls(min_year, max_year))
+    children.append(dcc.Graph(id=PLAY_GRAPH_ID, className='map-container', style={'display': 'none'}))
+
+    app.clientside_callback(
+        TOGGLE_JS,
+        Output(year_controls_id, 'style'),
+        Output(graph_id, 'style'),
+        Output(PLAY_CONTROLS_ID, 'style'),
+        Output(PLAY_GRAPH_ID, 'style'),
+        Input(MODE_ID, 'value')
+    )
+
+    def build_animation(year_range):
+        start, end = year_range
+        keys = store.keys[(store.keys >= start) & (store.keys <= end)].astype(int)
+        frame = store.range(start, end)
+        return template.render_frames(frame, store.key, keys, [map_title(key) for key in keys.tolist()],
+                                      duration=FRAME_DURATION_MS)
+
+    def update_animation(mode, year_range):
+        if mode != 'play' or not year_range:
+            raise PreventUpdate
+        year_range = (int(year_range[0]), int(year_range[1]))
+        return figure_cache.get_or_build(f'{name}-play', year_range, build_animation)
+
+    app.callback(
+        Output(PLAY_GRAPH_ID, 'figure'),
+        Input(MODE_ID, 'value'),
+        Input(PLAY_RANGE_ID, 'value'),
+        PAGE_STATE
+    )(coalesced(update_animation))
+    return update_animation
@@ -0,0 +1,197 @@
+# charts/python/common/binary_cache.py
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from charts.python.common.streaming import read_csv_chunked
+
+# === Config ===
+CACHE_DIR = os.environ.get('DATASET_CACHE_DIR', 'datasets/.cache')
+FORMAT_VERSION = 1
+
+# Typed conversions applied once before a CSV is written to the cache.
+# Dates map a column to the keyword arguments for pd.to_datetime.
+# 'stream' reads the file in chunks (see streaming.read_csv_chunked) with
+# a date window, categorical columns and float32/int32 downcasting.
+DATASET_TYPES = {
+    'datasets/yearly-co2-emissions.csv': {
+        'numeric': ['Year', 'Annual CO₂ emissions']
+    },
+    'datasets/map_forest_area.csv': {
+        'numeric': ['Year', 'Forest area']
+    },
+    'datasets/yearl_temperature.csv': {
+        'numeric': ['year', 'Average surface temperature']
+    },
+    'datasets/map_air_quality.csv': {
+        'numeric': ['AQI Value'],
+        'dates': {'Date': {}},
+        'stream': {
+            'categories': ['Country', 'Status'],
+            'window': ['Date', '2022-07-21', '2025-05-08']
+        }
+    },
+    'datasets/Pollution_Dataset.csv': {
+        'dates': {'Date': {'format': '%d/%m/%Y', 'errors': 'coerce'}},
+        'stream': {'categories': ['Country']}
+    },
+    'datasets/plastic_waste_VS_recycled..csv': {
+        'dates': {'Date': {'dayfirst': True}},
+        'stream': {'categories': ['Country']}
+    },
+}
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_root(path, numeric, dates, stream):
+    options = json.dumps([FORMAT_VERSION, sorted(numeric), dates, stream], sort_keys=True)
+    tag = hashlib.sha1(options.encode('utf-8')).hexdigest()[:10]
+    stem = os.path.splitext(os.path.basename(path))[0].strip('.').replace(' ', '_')
+    return os.path.join(CACHE_DIR, f'{stem}-{tag}')
+
+
+def _parse_csv(path, numeric, dates, stream=None):
+    if stream is not None:
+        return read_csv_chunked(path, numeric=numeric, dates=dates, **stream)
+    df = pd.read_csv(path)
+    for col in numeric:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    for col, kwargs in dates.items():
+        df[col] = pd.to_datetime(df[col], **kwargs)
+    return df
+
+
+def _write(df, target, source_meta):
+    tmp = f'{target}.tmp-{uuid.uuid4().hex}'
+    os.makedirs(tmp)
+    columns = []
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        entry = {'name': col, 'file': f'{i}.npy'}
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(tmp, entry['file']), values.cat.codes.to_numpy().astype(np.int32))
+            entry['kind'] = 'category'
+            entry['categories'] = [str(c) for c in values.cat.categories]
+        elif values.dtype == object:
+            codes, categories = pd.factorize(values)
+            np.save(os.path.join(tmp, entry['file']), codes.astype(np.int32))
+            entry['kind'] = 'strings'
+            entry['categories'] = [str(c) for c in categories]
+        else:
+            np.save(os.path.join(tmp, entry['file']), values.to_numpy())
+            entry['kind'] = 'array'
+        columns.append(entry)
+
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({**source_meta, 'columns': columns, 'rows': len(df)}, f)
+
+    try:
+        os.rename(tmp, target)
+    except OSError:
+        # Another process converted the same file first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _read(target):
+    with open(os.path.join(target, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+
+    data = {}
+    for entry in meta['columns']:
+        values = np.load(os.path.join(target, entry['file']), mmap_mode='r')
+        if entry['kind'] == 'strings':
+            categories = np.asarray(entry['categories'] + [np.nan], dtype=object)
+            values = categories[values]
+        elif entry['kind'] == 'category':
+            values = pd.Categorical.from_codes(values, categories=entry['categories'], validate=False)
+        data[entry['name']] = values
+    # copy=False keeps each numeric column backed by its memory map
+    return pd.DataFrame(data, copy=False)
+
+
+def _source_meta(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _find(root, path, meta):
+    """Return the cache directory still valid for ``path``, if any."""
+    stale = []
+    for target in glob.glob(os.path.join(root, '*')):
+        if '.tmp-' in target:
+            continue
+        try:
+            with open(os.path.join(target, 'meta.json'), encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            stale.append(target)
+            continue
+        if cached['size'] == meta['size'] and cached['mtime_ns'] == meta['mtime_ns']:
+            return target
+        # Same bytes under a new mtime (e.g. a fresh checkout)
+        if cached['size'] == meta['size'] and cached['sha1'] == file_hash(path):
+            cached['mtime_ns'] = meta['mtime_ns']
+            with open(os.path.join(target, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(cached, f)
+            return target
+        stale.append(target)
+    for target in stale:
+        shutil.rmtree(target, ignore_errors=True)
+    return None
+
+
+def read_csv(path, numeric=None, dates=None):
+    """
+    Read ``path`` from its binary cache, converting it on the first call.
+    Parameters
+    ----------
+    path : str
+        CSV under datasets/.
+    numeric, dates : optional
+        Typed conversions; default to the entry in DATASET_TYPES.
+    """
+    types = DATASET_TYPES.get(path, {})
+    numeric = list(types.get('numeric', []) if numeric is None else numeric)
+    dates = dict(types.get('dates', {}) if dates is None else dates)
+    stream = types.get('stream')
+
+    root = _cache_root(path, numeric, dates, stream)
+    meta = _source_meta(path)
+    try:
+        target = _find(root, path, meta)
+        if target is None:
+            df = _parse_csv(path, numeric, dates, stream)
+            meta['sha1'] = file_hash(path)
+            os.makedirs(root, exist_ok=True)
+            _write(df, os.path.join(root, meta['sha1'][:16]), meta)
+            return df
+        return _read(target)
+    except OSError as e:
+        # Read-only checkout or full disk: fall back to plain parsing
+        print(f"Dataset cache unavailable for {path}: {e}")
+        return _parse_csv(path, numeric, dates, stream)
+
+
+def convert_all(pattern='datasets/*.csv'):
+    for path in sorted(glob.glob(pattern)):
+        path = path.replace(os.sep, '/')
+        df = read_csv(path)
+        print(f"{path}: {len(df)} rows cached")
+
+
+if __name__ == '__main__':
+    convert_all()
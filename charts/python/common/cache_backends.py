@@ -0,0 +1,351 @@
+# charts/python/common/cache_backends.py
+
+import hashlib
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBackend:
+    def __init__(self, max_bytes, ttl=0):
+        """
+        Per-process LRU store.
+        Parameters
+        ----------
+        max_bytes : int
+            Total size of the stored values before the least recently used
+            entries are evicted.
+        ttl : float
+            Seconds an entry stays valid; 0 keeps entries until evicted.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires and expires < time.time():
+                self._size -= len(self._entries.pop(key)[0])
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            self.dropped += 1
+            return
+        expires = time.time() + self.ttl if self.ttl else 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[0])
+            self._entries[key] = (value, expires)
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self, prefix=None):
+        with self._lock:
+            if prefix is None:
+                self._entries.clear()
+                self._size = 0
+                return
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._size -= len(self._entries.pop(key)[0])
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._size, 'dropped': self.dropped}
+
+
+class DiskBackend:
+    def __init__(self, path, max_bytes, ttl=0, touch_interval=30):
+        """
+        SQLite file shared by every process that opens the same ``path``,
+        and kept across restarts. Parameters as for MemoryBackend, plus
+        ``touch_interval``, the seconds before a read refreshes the access
+        time used for LRU eviction; hits skip the refresh rather than wait
+        for the write lock. A database still locked after the timeout makes
+        a read a miss and a write a skipped store. Each process and thread
+        uses its own connection.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.touch_interval = touch_interval
+        self.dropped = 0
+        self.busy = 0
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value BLOB, size INTEGER, expires REAL, accessed REAL)'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+
+    def _connect(self):
+        # Connections must not cross a fork, so they are tied to the pid
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def get(self, key):
+        db = self._connect()
+        now = time.time()
+        try:
+            row = db.execute('SELECT value, expires, accessed FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires, accessed = row
+            if expires and expires < now:
+                db.execute('DELETE FROM entries WHERE key = ?', (key,))
+                return None
+        except sqlite3.OperationalError:
+            # Locked by other writers; the caller builds the figure instead
+            self.busy += 1
+            return None
+        if now - accessed > self.touch_interval:
+            self._touch(db, key, now)
+        return value
+
+    def _touch(self, db, key, now):
+        # Best effort: a hit never waits for the write lock
+        db.execute('PRAGMA busy_timeout = 0')
+        try:
+            db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+        except sqlite3.OperationalError:
+            self.busy += 1
+        finally:
+            db.execute('PRAGMA busy_timeout = 10000')
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            self.dropped += 1
+            return
+        now = time.time()
+        db = self._connect()
+        try:
+            self._store(db, key, value, now)
+        except sqlite3.OperationalError:
+            self.busy += 1
+            self.dropped += 1
+
+    def _store(self, db, key, value, now):
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            db.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)',
+                (key, value, len(value), now + self.ttl if self.ttl else 0, now)
+            )
+            db.execute('DELETE FROM entries WHERE expires > 0 AND expires < ?', (now,))
+            total = db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total > self.max_bytes:
+                # Drop the least recently used rows until the budget fits
+                db.execute(
+                    'DELETE FROM entries WHERE key IN ('
+                    ' SELECT key FROM (SELECT key, size, SUM(size) OVER (ORDER BY accessed, key) AS freed'
+                    ' FROM entries) WHERE freed - size < ?'
+                    ')',
+                    (total - self.max_bytes,)
+                )
+
+    def clear(self, prefix=None):
+        db = self._connect()
+        if prefix is None:
+            db.execute('DELETE FROM entries')
+        else:
+            db.execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def stats(self):
+        entries, size = self._connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries'
+        ).fetchone()
+        return {'entries': entries, 'bytes': size, 'dropped': self.dropped, 'busy': self.busy}
+
+
+# Slot header: sequence, prefix digest, key digest, expiry, write time,
+# length of the part in this slot, length of the whole value (first part only)
+_SLOT_HEADER = struct.Struct('<Q8s16sddII')
+_EMPTY_SLOT = (b'\0' * 8, b'\0' * 16, 0.0, 0.0, 0, 0)
+
+
+def default_shm_path():
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(directory, f'climate-figures-{os.getuid()}')
+
+
+def _digest(text, size):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=size).digest()
+
+
+class SharedMemoryBackend:
+    def __init__(self, path, max_bytes, ttl=0, slot_bytes=64 * 1024):
+        """
+        Fixed-slot table in a memory-mapped file under /dev/shm, shared by
+        every worker on the machine.
+        Parameters
+        ----------
+        path : str
+            Backing file; processes mapping the same file share entries.
+        max_bytes : int
+            Size of the segment, split into ``slot_bytes`` slots.
+        ttl : float
+            Seconds an entry stays valid; 0 keeps entries until replaced.
+        slot_bytes : int
+            Size of one slot, header included. Bigger values are split into
+            parts stored in several slots; values over a sixteenth of the
+            segment are not stored and are counted as dropped.
+
+        Each part may live in one of two slots; a new part replaces the
+        older of the two. Writers take a per-slot ``lockf`` range lock,
+        and readers retry when the slot's sequence number moved under them.
+        """
+        import fcntl
+        import mmap
+
+        self._fcntl = fcntl
+        self.path = path
+        self.ttl = ttl
+        self.slot_bytes = slot_bytes
+        self.part_bytes = slot_bytes - _SLOT_HEADER.size
+        self.slots = max(1, max_bytes // slot_bytes)
+        size = self.slots * slot_bytes
+        self.max_value = max(self.part_bytes, size // 16)
+        self.dropped = 0
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size != size:
+            # Layout changed; the old entries cannot be read back
+            os.ftruncate(fd, 0)
+            os.ftruncate(fd, size)
+        self._fd = fd
+        self._map = mmap.mmap(fd, size)
+        self._locks = [threading.Lock() for _ in range(64)]
+
+    def _digests(self, key, part=0):
+        # Parts after the first are keyed apart but share the app's prefix
+        return _digest(key.split('|', 1)[0], 8), _digest(key if not part else f'{key}#{part}', 16)
+
+    def _candidates(self, key_digest):
+        first = int.from_bytes(key_digest[:8], 'little') % self.slots
+        second = int.from_bytes(key_digest[8:], 'little') % self.slots
+        return (first, second) if second != first else (first,)
+
+    def _read_header(self, index):
+        return _SLOT_HEADER.unpack_from(self._map, index * self.slot_bytes)
+
+    def _read(self, index, prefix, key_digest):
+        """(value, write time, total length) of the part in slot ``index``."""
+        for _ in range(3):
+            seq, slot_prefix, slot_key, expires, written, length, total = self._read_header(index)
+            if seq % 2:
+                continue
+            if slot_key != key_digest or slot_prefix != prefix:
+                return None
+            if expires and expires < time.time():
+                return None
+            start = index * self.slot_bytes + _SLOT_HEADER.size
+            value = self._map[start:start + length]
+            # Only keep the value if no writer started meanwhile
+            if self._read_header(index)[0] == seq:
+                return value, written, total
+        return None
+
+    def _get_part(self, key, part):
+        prefix, key_digest = self._digests(key, part)
+        for index in self._candidates(key_digest):
+            found = self._read(index, prefix, key_digest)
+            if found is not None:
+                return found
+        return None
+
+    def get(self, key):
+        first = self._get_part(key, 0)
+        if first is None:
+            return None
+        value, written, total = first
+        if len(value) == total:
+            return value
+        if total > self.max_value:
+            return None
+        parts = [value]
+        for part in range(1, -(-total // self.part_bytes)):
+            found = self._get_part(key, part)
+            # A part evicted or left over from another write is a miss
+            if found is None or found[1] != written:
+                return None
+            parts.append(found[0])
+        value = b''.join(parts)
+        return value if len(value) == total else None
+
+    def _write(self, index, header, value=b''):
+        offset = index * self.slot_bytes
+        with self._locks[index % len(self._locks)]:
+            self._fcntl.lockf(self._fd, self._fcntl.LOCK_EX, 1, index)
+            try:
+                seq = _SLOT_HEADER.unpack_from(self._map, offset)[0]
+                # Odd while the slot is being rewritten
+                struct.pack_into('<Q', self._map, offset, seq + 1)
+                self._map[offset + _SLOT_HEADER.size:offset + _SLOT_HEADER.size + len(value)] = value
+                _SLOT_HEADER.pack_into(self._map, offset, seq + 2, *header)
+            finally:
+                self._fcntl.lockf(self._fd, self._fcntl.LOCK_UN, 1, index)
+
+    def put(self, key, value):
+        if len(value) > self.max_value:
+            self.dropped += 1
+            return
+        now = time.time()
+        expires = now + self.ttl if self.ttl else 0.0
+        parts = [value[i:i + self.part_bytes] for i in range(0, len(value), self.part_bytes)]
+        # The first part goes last, so a reader that finds it finds the rest
+        for part in reversed(range(len(parts))):
+            prefix, key_digest = self._digests(key, part)
+
+            def age(index):
+                _, _, slot_key, slot_expires, written, length, _ = self._read_header(index)
+                if slot_key == key_digest:
+                    return -2.0
+                if not length or (slot_expires and slot_expires < now):
+                    return -1.0
+                return written
+
+            index = min(self._candidates(key_digest), key=age)
+            header = (prefix, key_digest, expires, now, len(parts[part]), len(value) if not part else 0)
+            self._write(index, header, parts[part])
+
+    def clear(self, prefix=None):
+        # Entries are only identified by digests, so a prefix must be the
+        # whole first '|'-separated key segment (the app name)
+        prefix_digest = _digest(prefix.rstrip('|'), 8) if prefix is not None else None
+        for index in range(self.slots):
+            _, slot_prefix, _, _, _, length, _ = self._read_header(index)
+            if length and (prefix_digest is None or slot_prefix == prefix_digest):
+                self._write(index, _EMPTY_SLOT)
+
+    def stats(self):
+        entries = size = 0
+        now = time.time()
+        for index in range(self.slots):
+            _, _, _, expires, _, length, total = self._read_header(index)
+            if length and not (expires and expires < now):
+                # Only first parts carry the whole length
+                entries += bool(total)
+                size += length
+        return {'entries': entries, 'bytes': size, 'dropped': self.dropped}
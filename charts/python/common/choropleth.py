@@ -0,0 +1,129 @@
+# charts/python/common/choropleth.py
+
+import base64
+import os
+
+import numpy as np
+import pandas as pd
+
+# Render map figures from a prebuilt skeleton instead of plotly express.
+FAST_FIGURES = os.environ.get('FAST_FIGURES', '1') == '1'
+
+
+def typed_array(values):
+    """Encode a numeric array the way plotly 6 does (base64 typed array)."""
+    values = np.asarray(values)
+    dtype = 'i4' if values.dtype.kind in 'iu' else 'f8'
+    values = np.ascontiguousarray(values, dtype='<' + dtype)
+    return {'dtype': dtype, 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+
+
+def _column(frame, col):
+    values = frame[col].to_numpy()
+    if values.dtype.kind in 'if':
+        return values
+    return values.astype(object)
+
+
+class ChoroplethTemplate:
+    def __init__(self, figure, locations, color, hover_name, customdata=()):
+        """
+        Static skeleton of a single-trace plotly express choropleth.
+        Parameters
+        ----------
+        figure : plotly Figure
+            Fully styled figure built once with plotly express.
+        locations, color, hover_name : str
+            Columns used for the trace's locations, z and hovertext.
+        customdata : sequence of str
+            Columns in the order plotly express placed them in customdata.
+        """
+        skeleton = figure.to_plotly_json()
+        self.trace = {
+            key: value for key, value in skeleton['data'][0].items()
+            if key not in ('locations', 'z', 'hovertext', 'customdata')
+        }
+        self.layout = skeleton['layout']
+        self.locations = locations
+        self.color = color
+        self.hover_name = hover_name
+        self.customdata = list(customdata)
+
+    def render(self, frame, title):
+        """Return a figure dict for ``frame`` that only swaps the data arrays."""
+        trace = dict(self.trace)
+        trace['locations'] = _column(frame, self.locations).tolist()
+        trace['z'] = typed_array(frame[self.color].to_numpy())
+        trace['hovertext'] = _column(frame, self.hover_name).tolist()
+        if self.customdata:
+            columns = [_column(frame, col).tolist() for col in self.customdata]
+            trace['customdata'] = [list(row) for row in zip(*columns)]
+
+        layout = dict(self.layout)
+        layout['title'] = {**layout.get('title', {}), 'text': title}
+        return {'data': [trace], 'layout': layout}
+
+    def render_frames(self, frame, key, keys, titles, duration=300):
+        """
+        Return one animated figure with a frame per entry of ``keys``.
+
+        ``frame`` holds every row of the range. It is pivoted once into a
+        (key x location) matrix, so all frames share the trace's locations
+        and hovertext and only swap ``z`` and ``customdata``.
+        """
+        rows = np.searchsorted(keys, frame[key].to_numpy())
+        cols, locations = pd.factorize(frame[self.locations].astype(object))
+        shape = (len(keys), len(locations))
+
+        z = np.full(shape, np.nan)
+        z[rows, cols] = frame[self.color].to_numpy(dtype=float, na_value=np.nan)
+
+        customdata = []
+        for col in self.customdata:
+            values = np.full(shape, None, dtype=object)
+            values[rows, cols] = _column(frame, col)
+            customdata.append(values)
+        hovertext = np.full(len(locations), None, dtype=object)
+        hovertext[cols[::-1]] = _column(frame, self.hover_name)[::-1]
+
+        def frame_data(i):
+            data = {'z': typed_array(z[i])}
+            if customdata:
+                data['customdata'] = np.stack([values[i] for values in customdata], axis=1).tolist()
+            return data
+
+        names = [str(k) for k in keys]
+        frames = [
+            {'name': name, 'data': [frame_data(i)], 'layout': {'title': {'text': title}}}
+            for i, (name, title) in enumerate(zip(names, titles))
+        ]
+
+        trace = dict(self.trace)
+        trace['locations'] = [str(loc) for loc in locations]
+        trace['hovertext'] = hovertext.tolist()
+        trace.update(frame_data(0))
+
+        animate = {'frame': {'duration': duration, 'redraw': True}, 'mode': 'immediate',
+                   'transition': {'duration': 0}, 'fromcurrent': True}
+        layout = dict(self.layout)
+        layout['title'] = {**layout.get('title', {}), 'text': titles[0]}
+        layout['margin'] = {**layout.get('margin', {}), 't': 110}
+        layout['updatemenus'] = [{
+            'type': 'buttons', 'direction': 'left', 'showactive': False,
+            'x': 0, 'xanchor': 'left', 'y': 1.02, 'yanchor': 'bottom', 'pad': {'r': 10},
+            'buttons': [
+                {'label': 'Play', 'method': 'animate', 'args': [None, animate]},
+                {'label': 'Pause', 'method': 'animate',
+                 'args': [[None], {'frame': {'duration': 0, 'redraw': False}, 'mode': 'immediate'}]}
+            ]
+        }]
+        layout['sliders'] = [{
+            'active': 0, 'x': 0.15, 'len': 0.85, 'y': 1.02, 'yanchor': 'bottom',
+            'currentvalue': {'visible': False}, 'pad': {'t': 0, 'b': 0},
+            'steps': [
+                {'label': name, 'method': 'animate',
+                 'args': [[name], {**animate, 'frame': {'duration': 0, 'redraw': True}}]}
+                for name in names
+            ]
+        }]
+        return {'data': [trace], 'layout': layout, 'frames': frames}
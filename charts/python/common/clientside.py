@@ -0,0 +1,233 @@
+# charts/python/common/clientside.py
+
+import base64
+import gzip
+import json
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+from dash import Input, Output, State, dcc
+
+from charts.python.common.coalesce import PAGE_STATE, coalesced, install_page_id
+from charts.python.common.fast_json import dumps
+
+# Ship every slider position to the browser and switch years there.
+CLIENTSIDE_MAPS = os.environ.get('CLIENTSIDE_MAPS', '0') == '1'
+
+BUNDLE_STORE_ID = 'map-bundle'
+# Send at most one slider value per interval to the server (0 disables).
+SLIDER_THROTTLE_MS = int(os.environ.get('SLIDER_THROTTLE_MS', 150))
+THROTTLED_SUFFIX = '-throttled'
+
+# Decodes the gzip bundle once per page (DecompressionStream) and rebuilds
+# the figure for the selected slider position from the typed arrays.
+SWITCH_POSITION_JS = """
+function(value, bundle) {
+    if (!bundle || value === null || value === undefined) {
+        return window.dash_clientside.no_update;
+    }
+    var cache = window.__mapBundle;
+    if (!cache || cache.source !== bundle) {
+        var raw = Uint8Array.from(atob(bundle), function(c) { return c.charCodeAt(0); });
+        var stream = new Blob([raw]).stream().pipeThrough(new DecompressionStream('gzip'));
+        cache = window.__mapBundle = {
+            source: bundle,
+            data: new Response(stream).arrayBuffer().then(function(buffer) {
+                var headerLength = new DataView(buffer).getUint32(0, true);
+                var header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength)));
+                var base = 4 + headerLength;
+                var size = header.locations.length * header.keys.length;
+                header.z = new Float32Array(buffer, base + header.z_offset, size);
+                header.customdata.forEach(function(column) {
+                    if (column.kind === 'f8') {
+                        column.array = new Float64Array(buffer, base + column.offset, size);
+                    } else if (column.kind === 'codes') {
+                        var Codes = column.bytes === 2 ? Uint16Array : Uint8Array;
+                        column.array = new Codes(buffer, base + column.offset, size);
+                    }
+                });
+                return header;
+            })
+        };
+    }
+    return cache.data.then(function(b) {
+        var pos = b.keys.indexOf(value);
+        if (pos < 0) {
+            return window.dash_clientside.no_update;
+        }
+        var n = b.locations.length;
+        var locations = [], z = [], hovertext = [], customdata = [];
+        for (var j = 0; j < n; j++) {
+            var value_ = b.z[pos * n + j];
+            if (isNaN(value_)) {
+                continue;
+            }
+            locations.push(b.locations[j]);
+            z.push(value_);
+            hovertext.push(b.hovertext[j]);
+            customdata.push(b.customdata.map(function(column) {
+                if (column.kind === 'static') {
+                    return column.values[j];
+                }
+                var cell = column.array[pos * n + j];
+                if (column.kind === 'codes') {
+                    return cell === column.missing ? null : column.labels[cell];
+                }
+                return isNaN(cell) ? null : cell;
+            }));
+        }
+        var trace = Object.assign({}, b.trace, {
+            locations: locations, z: z, hovertext: hovertext
+        });
+        if (b.customdata.length) {
+            trace.customdata = customdata;
+        }
+        var layout = Object.assign({}, b.layout, {
+            title: Object.assign({}, b.layout.title, {text: b.titles[pos]})
+        });
+        return {data: [trace], layout: layout};
+    });
+}
+"""
+
+# Leading + trailing throttle: the first value goes out at once, later ones
+# at most every interval. Only the newest pending call resolves with a
+# value, so the final position of a drag is always delivered.
+THROTTLE_JS = """
+function(value) {
+    var state = window[%(state)s] = window[%(state)s] || {token: 0, last: 0};
+    var token = ++state.token;
+    var wait = state.last + %(interval)d - Date.now();
+    if (wait <= 0) {
+        state.last = Date.now();
+        return value;
+    }
+    return new Promise(function(resolve) {
+        setTimeout(function() {
+            if (token !== state.token) {
+                resolve(window.dash_clientside.no_update);
+                return;
+            }
+            state.last = Date.now();
+            resolve(value);
+        }, wait);
+    });
+}
+"""
+
+
+def _pad(buffer, alignment=8):
+    return buffer + b'\0' * (-len(buffer) % alignment)
+
+
+def build_bundle(store, template, titles):
+    """
+    Pack every slider position of a map into one gzip + base64 string.
+    Parameters
+    ----------
+    store : PartitionedFrame
+        Map data partitioned on the slider key.
+    template : ChoroplethTemplate
+        Supplies the figure skeleton and the column roles.
+    titles : list of str
+        Figure title for each key of ``store``.
+    """
+    frame = store.frame
+    rows = np.searchsorted(store.keys, frame[store.key].to_numpy())
+    cols, locations = pd.factorize(frame[template.locations].astype(object))
+    n_keys, n_locations = len(store.keys), len(locations)
+
+    def matrix(values, dtype, fill):
+        out = np.full((n_keys, n_locations), fill, dtype=dtype)
+        out[rows, cols] = values
+        return out
+
+    arrays = []
+    offset = 0
+
+    def add(array):
+        nonlocal offset
+        data = _pad(array.tobytes())
+        arrays.append(data)
+        start, offset = offset, offset + len(data)
+        return start
+
+    z = frame[template.color].to_numpy(dtype=np.float32, na_value=np.nan)
+    z_offset = add(matrix(z, np.float32, np.nan))
+
+    first = np.unique(cols, return_index=True)[1]
+    hovertext = frame[template.hover_name].astype(object).to_numpy()[first]
+
+    customdata = []
+    for col in template.customdata:
+        values = frame[col]
+        if pd.api.types.is_numeric_dtype(values):
+            data = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            customdata.append({'kind': 'f8', 'offset': add(matrix(data, np.float64, np.nan))})
+        elif values.astype(object).groupby(cols).nunique().max() <= 1:
+            static = values.astype(object).to_numpy()[first]
+            customdata.append({'kind': 'static', 'values': [None if pd.isna(v) else v for v in static]})
+        else:
+            codes, labels = pd.factorize(values.astype(object))
+            # The dtype's largest value marks missing cells
+            dtype = np.uint8 if len(labels) < np.iinfo(np.uint8).max else np.uint16
+            if len(labels) >= np.iinfo(np.uint16).max:
+                raise ValueError(f"Column {col!r} has too many labels ({len(labels)}) to encode")
+            missing = int(np.iinfo(dtype).max)
+            codes = np.where(codes < 0, missing, codes).astype(dtype)
+            customdata.append({
+                'kind': 'codes',
+                'bytes': np.dtype(dtype).itemsize,
+                'missing': missing,
+                'offset': add(matrix(codes, dtype, missing)),
+                'labels': [str(label) for label in labels]
+            })
+
+    skeleton = json.loads(dumps({'trace': template.trace, 'layout': template.layout}))
+    header = {
+        'keys': store.keys.tolist() if store.keys.dtype.kind in 'if' else list(range(n_keys)),
+        'titles': list(titles),
+        'locations': [str(loc) for loc in locations],
+        'hovertext': [None if pd.isna(v) else str(v) for v in hovertext],
+        'customdata': customdata,
+        'z_offset': z_offset,
+        'trace': skeleton['trace'],
+        'layout': skeleton['layout']
+    }
+    header_bytes = json.dumps(header, allow_nan=False).encode('utf-8')
+    # Typed array views need the body aligned to 8 bytes
+    header_bytes += b' ' * (-(4 + len(header_bytes)) % 8)
+
+    payload = struct.pack('<I', len(header_bytes)) + header_bytes + b''.join(arrays)
+    return base64.b64encode(gzip.compress(payload, mtime=0)).decode('ascii')
+
+
+def register_clientside_map(app, graph_id, slider_id, store_id=BUNDLE_STORE_ID):
+    app.clientside_callback(
+        SWITCH_POSITION_JS,
+        Output(graph_id, 'figure'),
+        Input(slider_id, 'value'),
+        State(store_id, 'data')
+    )
+
+
+def register_server_map(app, graph_id, slider_id, update_map, initial):
+    """
+    Render ``graph_id`` on the server from ``slider_id``. Slider values are
+    throttled in the browser (SLIDER_THROTTLE_MS) and superseded requests
+    of the same page are skipped on the server.
+    """
+    install_page_id(app)
+    source = Input(slider_id, 'value')
+    if SLIDER_THROTTLE_MS > 0:
+        store_id = slider_id + THROTTLED_SUFFIX
+        app.layout.children.append(dcc.Store(id=store_id, data=initial))
+        app.clientside_callback(
+            THROTTLE_JS % {'state': json.dumps('__throttle_' + slider_id), 'interval': SLIDER_THROTTLE_MS},
+            Output(store_id, 'data'),
+            Input(slider_id, 'value')
+        )
+        source = Input(store_id, 'data')
+    app.callback(Output(graph_id, 'figure'), source, PAGE_STATE)(coalesced(update_map))
@@ -0,0 +1,119 @@
+# charts/python/common/coalesce.py
+
+import functools
+import os
+import threading
+
+from dash import Input, Output, State, dcc
+from dash.exceptions import PreventUpdate
+from flask import has_request_context, request
+
+# === Config ===
+# Skip callback requests that a newer request from the same page superseded.
+COALESCE = os.environ.get('COALESCE_CALLBACKS', '1') == '1'
+# Store holding an id drawn in the browser once per page load
+PAGE_ID = 'page-id'
+PAGE_STATE = State(PAGE_ID, 'data')
+
+PAGE_ID_JS = """
+function(_, page) {
+    if (page) {
+        return window.dash_clientside.no_update;
+    }
+    var bytes = window.crypto.getRandomValues(new Uint8Array(12));
+    return Array.from(bytes, function(b) { return b.toString(16).padStart(2, '0'); }).join('');
+}
+"""
+
+
+class _Slot:
+    __slots__ = ('lock', 'latest', 'pending')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latest = 0
+        self.pending = 0
+
+
+class Coalescer:
+    def __init__(self):
+        """
+        Runs at most one callback per (page, output) at a time. Requests
+        that queue behind a running one are skipped with PreventUpdate when
+        a newer request for the same output arrived meanwhile, so only the
+        latest slider position of a drag is rendered.
+        """
+        self.skipped = 0
+        self.run_count = 0
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, func, *args, **kwargs):
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = _Slot()
+            slot.latest += 1
+            slot.pending += 1
+            seq = slot.latest
+        try:
+            with slot.lock:
+                if seq != slot.latest:
+                    with self._lock:
+                        self.skipped += 1
+                    raise PreventUpdate
+                with self._lock:
+                    self.run_count += 1
+                return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                slot.pending -= 1
+                if slot.pending == 0 and self._slots.get(key) is slot:
+                    del self._slots[key]
+
+    def stats(self):
+        with self._lock:
+            return {'in_flight': len(self._slots), 'runs': self.run_count, 'skipped': self.skipped}
+
+
+coalescer = Coalescer()
+
+
+def _request_key(page):
+    body = request.get_json(silent=True) or {}
+    return request.script_root, page, body.get('output')
+
+
+def coalesced(func):
+    """
+    Wrap a Dash callback so superseded requests are skipped. The callback
+    must be registered with ``PAGE_STATE`` as its last argument, which the
+    wrapper consumes; requests without a page id always run.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        *args, page = args
+        if not COALESCE or not page or not has_request_context():
+            return func(*args, **kwargs)
+        return coalescer.run(_request_key(page), func, *args, **kwargs)
+
+    return wrapper
+
+
+def install_page_id(app):
+    """
+    Give every page load of the Dash ``app`` its own coalescing id. A
+    cookie would be shared by all tabs of a browser, and an address by
+    everyone behind one proxy.
+    """
+    if getattr(app, '_page_id', False):
+        return app
+    app._page_id = True
+    app.layout.children.append(dcc.Store(id=PAGE_ID))
+    app.clientside_callback(
+        PAGE_ID_JS,
+        Output(PAGE_ID, 'data'),
+        Input(PAGE_ID, 'modified_timestamp'),
+        PAGE_STATE
+    )
+    return app
@@ -0,0 +1,62 @@
+# charts/python/common/correlation.py
+
+import numpy as np
+import pandas as pd
+
+
+class RangeCorrelation:
+    def __init__(self, rows, key, columns):
+        """
+        Prefix sums of per-key sufficient statistics for Pearson correlation.
+        Parameters
+        ----------
+        rows : DataFrame
+            Observations to correlate (one row per observation), without
+            missing values in ``columns``.
+        key : str
+            Column the range queries are made on, e.g. 'Year'.
+        columns : list of str
+            Numeric columns of the correlation matrix.
+        """
+        self.columns = list(columns)
+        keys, inverse = np.unique(rows[key].to_numpy(), return_inverse=True)
+        values = rows[self.columns].to_numpy(dtype=np.float64)
+
+        # Center on the global mean so the sums of squares stay well conditioned
+        values = values - values.mean(axis=0) if len(values) else values
+
+        n_keys, k = len(keys), len(self.columns)
+        counts = np.bincount(inverse, minlength=n_keys).astype(np.float64)
+        sums = np.zeros((n_keys, k))
+        np.add.at(sums, inverse, values)
+        products = np.zeros((n_keys, k, k))
+        for i in range(n_keys):
+            group = values[inverse == i]
+            products[i] = group.T @ group
+
+        self.keys = keys
+        self._counts = np.concatenate([[0.0], np.cumsum(counts)])
+        self._sums = np.concatenate([np.zeros((1, k)), np.cumsum(sums, axis=0)])
+        self._products = np.concatenate([np.zeros((1, k, k)), np.cumsum(products, axis=0)])
+
+    def corr(self, start, end):
+        """Correlation matrix of the rows with ``start <= key <= end``."""
+        lo = int(np.searchsorted(self.keys, start, side='left'))
+        hi = int(np.searchsorted(self.keys, end, side='right'))
+        k = len(self.columns)
+        n = self._counts[hi] - self._counts[lo] if hi > lo else 0.0
+
+        if n < 2:
+            matrix = np.full((k, k), np.nan)
+        else:
+            sums = self._sums[hi] - self._sums[lo]
+            cov = (self._products[hi] - self._products[lo]) - np.outer(sums, sums) / n
+            std = np.sqrt(np.clip(np.diag(cov), 0, None))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                matrix = cov / np.outer(std, std)
+            matrix[:, std == 0] = np.nan
+            matrix[std == 0, :] = np.nan
+            matrix = np.clip(matrix, -1, 1)
+            np.fill_diagonal(matrix, np.where(std > 0, 1.0, np.nan))
+
+        return pd.DataFrame(matrix, index=self.columns, columns=self.columns)
@@ -0,0 +1,162 @@
+# charts/python/common/countries.py
+
+import glob
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from charts.python.common import binary_cache, registry
+
+# Datasets whose Entity/Code columns supply the name -> ISO-3 table.
+CODE_DATASETS = ('co2', 'forest', 'temperature')
+ISO3_COL = 'ISO3'
+FORMAT_VERSION = 1
+
+# Spellings used by datasets without a Code column that the table lacks.
+ALIASES = {
+    'Czech Republic': 'CZE',
+    'French Guiana': 'GUF',
+    'Guernsey': 'GGY',
+    'Ivory Coast': 'CIV',
+    'Jersey': 'JEY',
+    'Macedonia': 'MKD',
+    'Palestinian Territory': 'PSE',
+    'Reunion': 'REU',
+    'Saint Barthelemy': 'BLM',
+    'Saint Martin (French part)': 'MAF',
+    'UK': 'GBR',
+    'United Kingdom of Great Britain and Northern Ireland': 'GBR',
+    'USA': 'USA',
+    'United States of America': 'USA',
+}
+
+_table = None
+_lock = threading.Lock()
+# Table built from reloaded datasets on the reloading thread, see _swap
+_pending = threading.local()
+
+
+def is_iso3(code):
+    # Aggregates carry OWID_* codes (World, Kosovo) or no code at all
+    return isinstance(code, str) and len(code) == 3 and code.isalpha() and code.isupper()
+
+
+def _cache_path():
+    # Content hashes follow the frames this thread reads, staged or published
+    sources = [[registry.dataset_path(name), registry.content_hash(name)] for name in CODE_DATASETS]
+    key = json.dumps([FORMAT_VERSION, sources, ALIASES], sort_keys=True)
+    tag = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(binary_cache.CACHE_DIR, f'countries-{tag}.json')
+
+
+def _build():
+    table = {}
+    for name in CODE_DATASETS:
+        pairs = registry.get_frame(name)[['Entity', 'Code']].astype(object).drop_duplicates()
+        for entity, code in pairs.itertuples(index=False):
+            if is_iso3(code):
+                table.setdefault(entity, code)
+    for alias, code in ALIASES.items():
+        table.setdefault(alias, code)
+    return table
+
+
+def iso3_table():
+    """
+    Return the country name -> ISO-3 mapping, building it on first use.
+
+    The table is persisted next to the dataset cache and rebuilt when one
+    of the CODE_DATASETS files or the aliases change. While datasets are
+    reloaded, the reloading thread gets a table of its own, which replaces
+    the served one when the new data is published.
+    """
+    global _table
+    registry.uses(*CODE_DATASETS)
+    if registry.staging() & set(CODE_DATASETS):
+        table = getattr(_pending, 'table', None)
+        if table is None:
+            table = _pending.table = _load()
+        return table
+    if _table is not None:
+        return _table
+    with _lock:
+        if _table is None:
+            _table = _load()
+        return _table
+
+
+def _load():
+    path = _cache_path()
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    table = _build()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.tmp-{os.getpid()}'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(table, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Country table cache unavailable: {e}")
+        return table
+    # Tables of earlier versions of the datasets are not read again
+    for stale in glob.glob(os.path.join(os.path.dirname(path), 'countries-*.json')):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return table
+
+
+@registry.on_reload
+def _reset(names):
+    # Drop what an earlier, failed reload may have left on this thread
+    _pending.table = None
+
+
+@registry.on_publish
+def _swap(names):
+    global _table
+    if names & set(CODE_DATASETS):
+        table, _pending.table = getattr(_pending, 'table', None), None
+        # Unused by the rebuilt apps: built from the new frames on first use
+        with _lock:
+            _table = table
+
+
+def resolve(names):
+    """ISO-3 code of every name in ``names``; None where it is not a country."""
+    table = iso3_table()
+    return np.array([table.get(name) for name in names], dtype=object)
+
+
+def name_hover(figure, name_col):
+    """
+    Give a choropleth keyed on ISO3_COL (hidden from hover_data) back the
+    '<name_col>=<name>' hover line it had when it was keyed on names.
+    """
+    for trace in figure.data:
+        trace.hovertemplate = trace.hovertemplate.replace('<br><br>', f'<br><br>{name_col}=%{{hovertext}}<br>', 1)
+    return figure
+
+
+def with_iso3(frame, name_col):
+    """
+    Drop rows of ``frame`` whose ``name_col`` is not a country and add
+    their ISO-3 code as ISO3_COL, so maps can use locationmode='ISO-3'.
+    """
+    names = frame[name_col].astype('category')
+    # Resolve each distinct name once, then broadcast through the codes
+    lookup = resolve(names.cat.categories)
+    positions = names.cat.codes.to_numpy()
+    row_codes = np.where(positions >= 0, lookup[positions], None)
+    keep = pd.notna(row_codes)
+    return frame[keep].assign(**{ISO3_COL: pd.Categorical(row_codes[keep])})
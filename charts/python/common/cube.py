@@ -0,0 +1,93 @@
+# charts/python/common/cube.py
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Resolution name -> pandas period frequency
+FREQUENCIES = {'weekly': 'W', 'monthly': 'M', 'yearly': 'Y'}
+REDUCTIONS = ('mean', 'max', 'p95')
+
+
+def _nanquantile(block, q):
+    # np.nanquantile(block, q, axis=0) with linear interpolation, without
+    # its per-column Python loop: NaNs sort last, so each column's valid
+    # values are its first n rows.
+    ordered = np.sort(block, axis=0)
+    n = (~np.isnan(block)).sum(axis=0)
+    pos = np.maximum(n - 1, 0) * q
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+    cols = np.arange(block.shape[1])
+    low, high = ordered[lo, cols], ordered[hi, cols]
+    result = low + (high - low) * (pos - lo)
+    return np.where(n > 0, result, np.nan).astype(np.float32)
+
+
+class DateCube:
+    def __init__(self, frame, date_col, location_col, value_col):
+        """
+        Dense (date x location) float32 matrix of one value column.
+        Parameters
+        ----------
+        frame : DataFrame
+            Long-format data. Rows with a missing value are ignored and
+            duplicate (date, location) rows are averaged.
+        date_col, location_col, value_col : str
+            Columns giving the row, the column and the cell value.
+        """
+        values = frame[value_col].to_numpy(dtype=float, na_value=np.nan)
+        keep = ~np.isnan(values)
+        self.dates, date_codes = np.unique(frame[date_col].to_numpy()[keep], return_inverse=True)
+        location_codes, self.locations = pd.factorize(frame[location_col].astype(object)[keep], sort=True)
+        self.location_index = {name: i for i, name in enumerate(self.locations)}
+
+        shape = (len(self.dates), len(self.locations))
+        sums = np.zeros(shape)
+        counts = np.zeros(shape)
+        np.add.at(sums, (date_codes, location_codes), values[keep])
+        np.add.at(counts, (date_codes, location_codes), 1)
+        with np.errstate(invalid='ignore'):
+            self.values = (sums / counts).astype(np.float32)
+
+        self._resampled = {}
+        self._lock = threading.Lock()
+
+    def periods(self, resolution):
+        """Start timestamp and first row of every period at ``resolution``."""
+        periods = pd.DatetimeIndex(self.dates).to_period(FREQUENCIES[resolution])
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+        return periods[starts].start_time, starts
+
+    def resample(self, resolution, how):
+        """
+        Return ``(period_starts, matrix)`` with one row per period, reduced
+        over the dates in that period with ``how`` (mean, max or p95).
+        Locations without data in a period are NaN.
+        """
+        key = (resolution, how)
+        with self._lock:
+            cached = self._resampled.get(key)
+        if cached is not None:
+            return cached
+
+        labels, starts = self.periods(resolution)
+        values = self.values
+        if how == 'mean':
+            present = ~np.isnan(values)
+            sums = np.add.reduceat(np.where(present, values, 0).astype(np.float64), starts, axis=0)
+            counts = np.add.reduceat(present, starts, axis=0)
+            with np.errstate(invalid='ignore'):
+                matrix = (sums / counts).astype(np.float32)
+        elif how == 'max':
+            matrix = np.fmax.reduceat(values, starts, axis=0)
+        elif how == 'p95':
+            stops = np.r_[starts[1:], len(values)]
+            matrix = np.stack([_nanquantile(values[start:stop], 0.95) for start, stop in zip(starts, stops)])
+        else:
+            raise ValueError(f"Unknown reduction {how!r}; expected one of {REDUCTIONS}")
+
+        with self._lock:
+            self._resampled[key] = (labels, matrix)
+        return labels, matrix
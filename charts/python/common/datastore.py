@@ -0,0 +1,87 @@
+# charts/python/common/datastore.py
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from charts.python.common.registry import on_reload, tracking, uses
+
+
+class PartitionedFrame:
+    def __init__(self, df, key):
+        """
+        DataFrame sorted by a key with the row offsets of every key value.
+        Parameters
+        ----------
+        df : DataFrame
+            Source data. Rows with a missing key are dropped.
+        key : str
+            Column to partition on (a year, a date or a country).
+        """
+        # Only copy when needed so shared registry frames stay shared
+        if df[key].isna().any():
+            df = df.dropna(subset=[key])
+        if not df[key].is_monotonic_increasing:
+            df = df.sort_values(key, kind='mergesort')
+        if not df.index.equals(pd.RangeIndex(len(df))):
+            df = df.reset_index(drop=True)
+        self.key = key
+        self.frame = df
+
+        values = self.frame[key].to_numpy()
+        self.keys, starts = np.unique(values, return_index=True)
+        self._starts = starts
+        self._stops = np.append(starts[1:], len(values))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def position(self, value):
+        pos = int(np.searchsorted(self.keys, value))
+        if pos < len(self.keys) and self.keys[pos] == value:
+            return pos
+        return None
+
+    def slice_at(self, pos):
+        """Rows of the ``pos``-th key value, as a view into the sorted frame."""
+        return self.frame.iloc[self._starts[pos]:self._stops[pos]]
+
+    def slice(self, value):
+        pos = self.position(value)
+        if pos is None:
+            return self.frame.iloc[0:0]
+        return self.slice_at(pos)
+
+    def range(self, start, end):
+        """Rows with ``start <= key <= end``."""
+        lo = int(np.searchsorted(self.keys, start, side='left'))
+        hi = int(np.searchsorted(self.keys, end, side='right'))
+        if lo >= hi:
+            return self.frame.iloc[0:0]
+        return self.frame.iloc[self._starts[lo]:self._stops[hi - 1]]
+
+
+# (name, key) -> (store, datasets its loader read)
+_stores = {}
+_lock = threading.Lock()
+
+
+def partitioned(name, loader, key):
+    """Load dataset ``name`` once per process and partition it on ``key``."""
+    with _lock:
+        cached = _stores.get((name, key))
+        if cached is None:
+            with tracking() as datasets:
+                store = PartitionedFrame(loader(), key)
+            cached = _stores[(name, key)] = (store, datasets | {name})
+    uses(*cached[1])
+    return cached[0]
+
+
+@on_reload
+def _discard(names):
+    # Apps still serving the old data keep their own reference
+    with _lock:
+        for k in [k for k, (_, datasets) in _stores.items() if datasets & names]:
+            del _stores[k]
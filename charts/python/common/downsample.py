@@ -0,0 +1,85 @@
+# charts/python/common/downsample.py
+
+import os
+
+import numpy as np
+
+# === Config ===
+# Points drawn per trace; longer series are reduced to about this many.
+MAX_POINTS = int(os.environ.get('DOWNSAMPLE_POINTS', 2000))
+# 'lttb' keeps the shape of the line; 'minmax' keeps every peak and trough.
+METHOD = os.environ.get('DOWNSAMPLE_METHOD', 'lttb')
+
+
+def lttb(x, y, threshold):
+    """
+    Indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept. The rest of the series is split
+    into ``threshold - 2`` buckets, and each bucket keeps the point that
+    forms the largest triangle with the previous pick and the mean of the
+    next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # Relative x keeps the triangle areas well inside float64 precision
+    x = np.asarray(x, dtype=np.float64) - x[0]
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # The last bucket looks ahead to the final point
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def minmax(y, threshold):
+    """
+    Indices of the first and last points plus the minimum and maximum of
+    each of ``(threshold - 2) // 2`` equal-width buckets, in order; at
+    most ``threshold`` points.
+    """
+    n = len(y)
+    buckets = (threshold - 2) // 2
+    if threshold >= n or buckets < 1:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    starts = np.linspace(0, n, buckets + 1).astype(np.int64)[:-1]
+    bucket = np.repeat(np.arange(buckets), np.diff(np.append(starts, n)))
+    picked = [0, n - 1]
+    for reduce in (np.minimum, np.maximum):
+        extreme = reduce.reduceat(y, starts)
+        hits = np.flatnonzero(y == extreme[bucket])
+        # First hit of each bucket
+        _, first = np.unique(bucket[hits], return_index=True)
+        picked.append(hits[first])
+    return np.unique(np.concatenate([np.asarray(p, dtype=np.int64).ravel() for p in picked]))
+
+
+def downsample(x, y, threshold=MAX_POINTS, method=METHOD):
+    """
+    Indices of the points of (``x``, ``y``) to draw, ascending. Series
+    with at most ``threshold`` points are returned whole; missing values
+    are skipped before reducing.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= threshold:
+        return np.arange(len(y))
+    valid = np.flatnonzero(~np.isnan(y))
+    if method == 'lttb':
+        return valid[lttb(np.asarray(x)[valid], y[valid], threshold)]
+    if method == 'minmax':
+        return valid[minmax(y[valid], threshold)]
+    raise ValueError(f"Unknown downsampling method {method!r}; expected lttb or minmax")
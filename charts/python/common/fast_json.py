@@ -0,0 +1,36 @@
+# charts/python/common/fast_json.py
+
+import json
+
+import plotly.io as pio
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+)
+
+
+def dumps(figure):
+    """
+    Serialize a figure to a JSON string.
+
+    Plain dicts (e.g. from ChoroplethTemplate.render) go through orjson,
+    which encodes numpy arrays natively; plotly Figure objects and
+    anything orjson rejects fall back to plotly's own encoder.
+    """
+    if orjson is not None and isinstance(figure, dict):
+        try:
+            return orjson.dumps(figure, option=_ORJSON_OPTIONS).decode('utf-8')
+        except TypeError:
+            pass
+    return pio.to_json(figure, validate=False)
+
+
+def loads(payload):
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
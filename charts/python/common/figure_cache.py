@@ -0,0 +1,140 @@
+# charts/python/common/figure_cache.py
+
+import os
+import threading
+
+from flask import current_app, has_app_context
+
+from charts.python.common import binary_cache
+from charts.python.common.cache_backends import DiskBackend, MemoryBackend, SharedMemoryBackend, default_shm_path
+from charts.python.common.fast_json import dumps, loads
+from charts.python.common.instrumentation import stage
+from charts.python.common.registry import data_version
+
+# === Config ===
+# Byte budget for all cached figures across every mounted app.
+MAX_BYTES = int(os.environ.get('FIGURE_CACHE_BYTES', 64 * 1024 * 1024))
+# Build every slider position at startup in a background thread.
+PREWARM = os.environ.get('FIGURE_CACHE_PREWARM', '0') == '1'
+# 'memory' (per process), 'disk' (SQLite file) or 'shm' (shared memory).
+BACKEND = os.environ.get('FIGURE_CACHE_BACKEND', 'memory')
+# Seconds a cached figure stays valid; 0 keeps it until evicted.
+TTL = float(os.environ.get('FIGURE_CACHE_TTL', 0))
+DISK_PATH = os.environ.get('FIGURE_CACHE_PATH', os.path.join(binary_cache.CACHE_DIR, 'figures.sqlite'))
+SHM_PATH = os.environ.get('FIGURE_CACHE_SHM_PATH')
+SHM_SLOT_BYTES = int(os.environ.get('FIGURE_CACHE_SLOT_BYTES', 64 * 1024))
+
+
+def make_backend(name=BACKEND, max_bytes=MAX_BYTES, ttl=TTL):
+    if name == 'memory':
+        return MemoryBackend(max_bytes, ttl)
+    if name == 'disk':
+        return DiskBackend(DISK_PATH, max_bytes, ttl)
+    if name == 'shm':
+        return SharedMemoryBackend(SHM_PATH or default_shm_path(), max_bytes, ttl, SHM_SLOT_BYTES)
+    raise ValueError(f"Unknown figure cache backend {name!r}; expected memory, disk or shm")
+
+
+def serving_version():
+    """
+    Data version of the app handling the current request, stamped when it
+    was built, so an app about to be replaced by a reload never caches its
+    figures under the new token. Outside requests, the current version.
+    """
+    if has_app_context():
+        version = current_app.config.get('DATA_VERSION')
+        if version is not None:
+            return version
+    return data_version()
+
+
+class FigureCache:
+    def __init__(self, backend=None, version=serving_version):
+        """
+        Cache of serialized figures keyed by (app, slider position).
+        Parameters
+        ----------
+        backend : MemoryBackend, DiskBackend or SharedMemoryBackend
+            Where payloads live; defaults to ``make_backend()``. The disk
+            and shared-memory stores are shared by every worker.
+        version : callable
+            Returns a token for the current datasets. It is part of every
+            key, so figures built from older data are never returned.
+        """
+        self.backend = backend if backend is not None else make_backend()
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Cache key -> [build lock, threads holding or waiting for it]
+        self._building = {}
+
+    def _key(self, app_name, key):
+        return f'{app_name}|{self.version()}|{key!r}'
+
+    def get(self, app_name, key):
+        payload = self.backend.get(self._key(app_name, key))
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return payload
+
+    def put(self, app_name, key, figure):
+        with stage('serialize'):
+            payload = dumps(figure).encode('utf-8')
+        self.backend.put(self._key(app_name, key), payload)
+        return payload
+
+    def get_or_build(self, app_name, key, builder):
+        """
+        Return the cached figure for ``key``, building it on a miss.
+        Concurrent misses for the same key wait for one build instead of
+        each building and serializing the figure.
+        """
+        payload = self.get(app_name, key)
+        if payload is None:
+            cache_key = self._key(app_name, key)
+            with self._lock:
+                entry = self._building.setdefault(cache_key, [threading.Lock(), 0])
+                entry[1] += 1
+            try:
+                with entry[0]:
+                    payload = self.backend.get(cache_key)
+                    if payload is None:
+                        with stage('build'):
+                            figure = builder(key)
+                        payload = self.put(app_name, key, figure)
+            finally:
+                with self._lock:
+                    entry[1] -= 1
+                    if not entry[1]:
+                        del self._building[cache_key]
+        with stage('decode'):
+            return loads(payload)
+
+    def warm(self, app_name, keys, builder, background=True):
+        def run():
+            for key in keys:
+                if self.get(app_name, key) is None:
+                    self.put(app_name, key, builder(key))
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name=f'prewarm-{app_name}', daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate(self, app_name=None):
+        self.backend.clear(None if app_name is None else f'{app_name}|')
+
+    def stats(self):
+        with self._lock:
+            counts = {'hits': self.hits, 'misses': self.misses}
+        return {**self.backend.stats(), **counts}
+
+
+# Shared by every Dash app mounted in app.py
+figure_cache = FigureCache()
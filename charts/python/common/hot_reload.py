@@ -0,0 +1,123 @@
+# charts/python/common/hot_reload.py
+
+import os
+import threading
+import time
+
+from charts.python.common import registry
+from charts.python.common.binary_cache import file_hash
+
+# === Config ===
+# Watch the dataset files and swap in new data without a restart.
+HOT_RELOAD = os.environ.get('HOT_RELOAD', '1') == '1'
+# Seconds between checks of the dataset files.
+INTERVAL = float(os.environ.get('HOT_RELOAD_INTERVAL', 2))
+
+
+def signature(path):
+    """(path, mtime_ns, size) of ``path``, or None when it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return path, st.st_mtime_ns, st.st_size
+
+
+class DatasetWatcher:
+    def __init__(self, mounts, interval=INTERVAL, on_reload=None):
+        """
+        Polls the registry's dataset files and reloads the ones that changed.
+        Parameters
+        ----------
+        mounts : LazyMounts
+            Mounted apps; those that read a changed dataset are rebuilt.
+        interval : float
+            Seconds between polls. A file is reloaded once its signature
+            is the same on two polls in a row, i.e. it is no longer being
+            written.
+        on_reload : callable, optional
+            Called as ``on_reload(names)`` after new data is published,
+            e.g. to drop cached responses.
+        """
+        self.mounts = mounts
+        self.interval = interval
+        self.on_reload = on_reload
+        self.reloads = 0
+        self.failures = 0
+        self.last = None
+        self._seen = self.signatures()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def signatures(self):
+        return {name: signature(registry.DATASETS[name]['path']) for name in registry.DATASETS}
+
+    def poll(self):
+        """Check the files once; return the datasets reloaded, if any."""
+        current = self.signatures()
+        # A deleted file keeps its last data until it comes back
+        changed = {name for name, sig in current.items() if sig is not None and sig != self._seen.get(name)}
+        ready = {name for name in changed if self._pending.get(name) == current[name]}
+        self._pending = {name: current[name] for name in changed - ready}
+        if not ready:
+            return set()
+        try:
+            self.reload(ready)
+        except Exception as e:
+            self.failures += 1
+            print(f"Could not reload {sorted(ready)}: {e}")
+        # Either way, wait for the next change before trying again
+        self._seen.update({name: current[name] for name in ready})
+        return ready
+
+    def reload(self, names):
+        """
+        Re-read datasets ``names`` and rebuild the mounted apps reading them.
+
+        New frames and indexes are built in this thread while the old apps
+        keep serving. The rebuilt apps are mounted first and the new data
+        version is published last, so a cache key carrying the new version
+        is never filled by an old app.
+        """
+        with self._lock:
+            start = time.perf_counter()
+            names = set(names)
+            frames = {name: registry.load_frame(name) for name in names if registry.is_loaded(name)}
+            hashes = {name: file_hash(registry.DATASETS[name]['path']) for name in names}
+            prefixes = self.mounts.dependents(names)
+            with registry.staged(frames, hashes):
+                built = {prefix: self.mounts.rebuild(prefix) for prefix in prefixes}
+                version = registry.data_version()
+            self.mounts.replace(built, version)
+            registry.publish(frames, hashes)
+            if self.on_reload is not None:
+                self.on_reload(names)
+            self.reloads += 1
+            self.last = {
+                'datasets': sorted(names), 'mounts': sorted(built),
+                'seconds': round(time.perf_counter() - start, 3), 'version': version,
+            }
+            print(f"Reloaded {', '.join(sorted(names))} ({', '.join(sorted(built)) or 'no mounts'}) "
+                  f"in {self.last['seconds']:.2f}s")
+
+    def start(self):
+        """Poll in a daemon thread of this process."""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(self.interval):
+                self.poll()
+
+        self._thread = threading.Thread(target=run, name='dataset-watcher', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,342 @@
+# charts/python/common/http_cache.py
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+from charts.python.common.instrumentation import METRICS, metrics
+
+# === Config ===
+RESPONSE_CACHE = os.environ.get('RESPONSE_CACHE', '1') == '1'
+# Byte budget for cached bodies, including their compressed variants.
+MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_BYTES', 64 * 1024 * 1024))
+# Smaller bodies are sent as they are; compressing them does not pay off.
+MIN_COMPRESS_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Dash endpoints whose response depends only on the request and the data.
+CACHEABLE_SUFFIXES = ('/_dash-layout', '/_dash-dependencies', '/_dash-update-component')
+CACHEABLE_PARTS = ('/_dash-component-suites/',)
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/javascript', 'text/javascript',
+    'text/html', 'text/css', 'text/plain', 'image/svg+xml'
+)
+# Headers recomputed for every representation sent.
+_REPLACED = {'content-length', 'content-encoding', 'etag', 'vary'}
+# Headers describing one request only; never replayed from the cache.
+_PER_REQUEST = {'server-timing', 'x-profile-file', 'date'}
+_ETAG = re.compile(r'\s*(?:W/)?("[^"]*"|\*)\s*(?:,|$)')
+
+
+def negotiate(accept_encoding):
+    """Best encoding the client accepts: 'br', 'gzip' or None."""
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _header(headers, name):
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def if_none_match(header, etag):
+    """
+    Whether the If-None-Match ``header`` lists ``etag`` (or is ``*``). The
+    comparison is weak, as RFC 9110 asks for this header: a ``W/`` prefix
+    is ignored, the quoted tag must match exactly.
+    """
+    return any(tag in ('*', etag) for tag in _ETAG.findall(header or ''))
+
+
+def _labels(path, body):
+    # Same app and endpoint labels as instrument_server gives the request
+    app, _, rest = path.lstrip('/').partition('/')
+    if path.endswith('/_dash-update-component'):
+        try:
+            output = json.loads(body).get('output', '?')
+        except (ValueError, AttributeError):
+            output = '?'
+        return app, f'callback:{output}'
+    if '/_dash-component-suites/' in path:
+        return app, '/_dash-component-suites/'
+    return app, '/' + rest
+
+
+def _compressible(headers, body):
+    content_type = (_header(headers, 'Content-Type') or '').split(';')[0].strip()
+    return (
+        len(body) >= MIN_COMPRESS_SIZE
+        and content_type in COMPRESSIBLE_TYPES
+        and _header(headers, 'Content-Encoding') is None
+    )
+
+
+class _Entry:
+    __slots__ = ('key', 'labels', 'status', 'headers', 'body', 'tag', 'variants', 'compressible')
+
+    def __init__(self, status, headers, body):
+        self.key = None
+        self.labels = None
+        self.status = status
+        self.headers = [(k, v) for k, v in headers if k.lower() not in _REPLACED]
+        self.body = body
+        self.tag = hashlib.sha1(body).hexdigest()[:20]
+        self.variants = {}
+        self.compressible = _compressible(headers, body)
+        if self.compressible:
+            vary = _header(headers, 'Vary')
+            self.headers.append(('Vary', f'{vary}, Accept-Encoding' if vary else 'Accept-Encoding'))
+
+    def size(self):
+        return len(self.body) + sum(map(len, self.variants.values()))
+
+
+class ResponseCache:
+    def __init__(self, app, version=None, max_bytes=MAX_BYTES):
+        """
+        WSGI middleware that compresses responses and answers repeated
+        Dash requests from memory.
+        Parameters
+        ----------
+        app : WSGI application
+            Usually the DispatcherMiddleware holding every mounted app.
+        version : callable, optional
+            Returns a token for the current data; it is part of every cache
+            key, so changed datasets never serve stale figures.
+        max_bytes : int
+            Total size of cached bodies before the least recently used
+            entries are evicted.
+
+        Layout, dependency and callback responses are keyed on the method,
+        path, query, request body and data version; a POST whose body has
+        no Content-Length and is not terminated by the server is never
+        cached. Each entry carries an ETag derived from its body, so clients
+        that revalidate get a 304. Other responses are only compressed.
+
+        Hits never reach the Flask apps, so their latency is recorded in
+        ``metrics.cached_seconds`` rather than the request histograms, and
+        the coalescer does not see them.
+        """
+        self.app = app
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        path = environ.get('SCRIPT_NAME', '') + environ.get('PATH_INFO', '')
+        if method not in ('GET', 'POST'):
+            return self.app(environ, start_response)
+
+        start = time.perf_counter()
+        key = request_body = None
+        if path.endswith(CACHEABLE_SUFFIXES) or any(part in path for part in CACHEABLE_PARTS):
+            request_body = self._read_body(environ, method)
+            if request_body is not None:
+                key = self._key(environ, method, path, request_body)
+        if key is not None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+            if entry is not None:
+                return self._send(entry, environ, start_response, start=start)
+
+        status, headers, body = self._call(environ)
+        entry = _Entry(status, headers, body)
+        cacheable = (
+            key is not None
+            and status.startswith('200')
+            and _header(headers, 'Set-Cookie') is None
+            and len(body) <= self.max_bytes // 4
+        )
+        if cacheable:
+            # Make browsers revalidate, so repeat GETs become 304s
+            if _header(entry.headers, 'Cache-Control') is None:
+                entry.headers.append(('Cache-Control', 'no-cache'))
+            extra = [(k, v) for k, v in entry.headers if k.lower() in _PER_REQUEST]
+            entry.headers = [(k, v) for k, v in entry.headers if k.lower() not in _PER_REQUEST]
+            with self._lock:
+                self.misses += 1
+            entry.labels = _labels(path, request_body)
+            self._store(key, entry)
+            return self._send(entry, environ, start_response, extra)
+        return self._send_uncached(entry, headers, environ, start_response)
+
+    def _read_body(self, environ, method):
+        """
+        The request body, put back for the app to read; None when its end
+        is unknown (chunked without a terminated stream) or malformed.
+        """
+        if method != 'POST':
+            return b''
+        stream = environ['wsgi.input']
+        if environ.get('wsgi.input_terminated'):
+            body = stream.read()
+        else:
+            length = environ.get('CONTENT_LENGTH')
+            if not length:
+                return None
+            try:
+                body = stream.read(int(length))
+            except ValueError:
+                return None
+        environ['wsgi.input'] = io.BytesIO(body)
+        environ['CONTENT_LENGTH'] = str(len(body))
+        return body
+
+    def _key(self, environ, method, path, body):
+        digest = hashlib.sha1()
+        for part in (self.version() if self.version else '', method, path, environ.get('QUERY_STRING', '')):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(body)
+        return digest.digest()
+
+    def _call(self, environ):
+        captured = []
+
+        def start_response(status, headers, exc_info=None):
+            captured[:] = [status, list(headers)]
+            return lambda data: chunks.append(data)
+
+        chunks = []
+        result = self.app(environ, start_response)
+        try:
+            chunks.extend(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return captured[0], captured[1], b''.join(chunks)
+
+    def _store(self, key, entry):
+        entry.key = key
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old.size()
+            self._entries[key] = entry
+            self._size += entry.size()
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            _, old = self._entries.popitem(last=False)
+            self._size -= old.size()
+
+    def _variant(self, entry, encoding):
+        body = entry.variants.get(encoding)
+        if body is None:
+            body = compress(entry.body, encoding)
+            with self._lock:
+                if encoding not in entry.variants:
+                    entry.variants[encoding] = body
+                    if self._entries.get(entry.key) is entry:
+                        self._size += len(body)
+                        self._evict()
+        return body
+
+    def _send(self, entry, environ, start_response, extra=(), start=None):
+        """Send ``entry``; ``start`` is set for hits, whose latency is recorded here."""
+        encoding = negotiate(environ.get('HTTP_ACCEPT_ENCODING', '')) if entry.compressible else None
+        etag = f'"{entry.tag}-{encoding}"' if encoding else f'"{entry.tag}"'
+        headers = list(entry.headers) + list(extra) + [('ETag', etag)]
+
+        if if_none_match(environ.get('HTTP_IF_NONE_MATCH'), etag):
+            with self._lock:
+                self.not_modified += 1
+            kept = [(k, v) for k, v in headers if k.lower() in ('etag', 'vary', 'cache-control')]
+            start_response('304 Not Modified', kept)
+            self._observe(entry, start, '304')
+            return [b'']
+
+        body = self._variant(entry, encoding) if encoding else entry.body
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(len(body))))
+        with self._lock:
+            self.bytes_in += len(entry.body)
+            self.bytes_out += len(body)
+        start_response(entry.status, headers)
+        self._observe(entry, start, entry.status.split(' ', 1)[0])
+        return [body]
+
+    def _observe(self, entry, start, status):
+        if start is not None and METRICS and entry.labels is not None:
+            metrics.cached_seconds.observe(time.perf_counter() - start, *entry.labels, status)
+
+    def _send_uncached(self, entry, headers, environ, start_response):
+        encoding = negotiate(environ.get('HTTP_ACCEPT_ENCODING', '')) if entry.compressible else None
+        if encoding is None:
+            start_response(entry.status, headers)
+            return [entry.body]
+
+        body = compress(entry.body, encoding)
+        upstream = _header(headers, 'ETag')
+        headers = list(entry.headers) + [
+            ('Content-Encoding', encoding),
+            ('Content-Length', str(len(body))),
+        ]
+        if upstream:
+            # The upstream validator described the uncompressed bytes
+            headers.append(('ETag', upstream if upstream.startswith('W/') else f'W/{upstream}'))
+        with self._lock:
+            self.bytes_in += len(entry.body)
+            self.bytes_out += len(body)
+        start_response(entry.status, headers)
+        return [body]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries), 'bytes': self._size, 'hits': self.hits,
+                'misses': self.misses, 'not_modified': self.not_modified,
+                'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out
+            }
@@ -0,0 +1,235 @@
+# charts/python/common/instrumentation.py
+
+import bisect
+import cProfile
+import contextvars
+import os
+import threading
+import time
+from contextlib import ContextDecorator
+
+from flask import g, request
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+# === Config ===
+METRICS = os.environ.get('METRICS', '1') == '1'
+# Profile requests sent with this header (value 'cprofile' or 'pyinstrument').
+PROFILE_HEADER = 'X-Profile'
+PROFILING = os.environ.get('PROFILING', '0') == '1'
+# Fraction of requests profiled without the header.
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'datasets/.cache/profiles')
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels):
+        """
+        Prometheus-style cumulative histogram.
+        Parameters
+        ----------
+        name : str
+            Metric name.
+        help_text : str
+            One-line description for the ``# HELP`` line.
+        buckets : sequence of float
+            Upper bounds of the buckets, ascending; ``+Inf`` is implied.
+        labels : sequence of str
+            Label names, given as values in the same order to ``observe``.
+        """
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        for label_values, counts, total in series:
+            labels = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    def __init__(self):
+        """Every histogram and gauge exposed on /metrics."""
+        self.request_seconds = Histogram(
+            'http_request_duration_seconds', 'Request latency by mount and endpoint.',
+            LATENCY_BUCKETS, ('app', 'endpoint', 'status'))
+        self.response_bytes = Histogram(
+            'http_response_size_bytes', 'Response body size by mount and endpoint.',
+            SIZE_BUCKETS, ('app', 'endpoint'))
+        self.stage_seconds = Histogram(
+            'stage_duration_seconds', 'Time spent in each stage of a request.',
+            LATENCY_BUCKETS, ('app', 'endpoint', 'stage'))
+        self.cached_seconds = Histogram(
+            'http_cached_response_duration_seconds', 'Latency of responses answered by the response cache.',
+            LATENCY_BUCKETS, ('app', 'endpoint', 'status'))
+        self._gauges = {}
+
+    def gauge(self, name, help_text, func):
+        """Expose ``func()`` (a number) as a gauge read at scrape time."""
+        self._gauges[name] = (help_text, func)
+
+    def render(self):
+        lines = []
+        for histogram in (self.request_seconds, self.response_bytes, self.stage_seconds, self.cached_seconds):
+            lines.extend(histogram.render())
+        for name, (help_text, func) in self._gauges.items():
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {func()}'])
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+# Stage timings of the request being handled on this thread/context
+_stages = contextvars.ContextVar('stages', default=None)
+# Innermost open stage: [time spent in stages nested inside it, its start,
+# the entry of the stage enclosing it]
+_nested = contextvars.ContextVar('nested', default=None)
+_profile_lock = threading.Lock()
+
+
+class stage(ContextDecorator):
+    def __init__(self, name):
+        """
+        Time a block (or function) as stage ``name`` of the current request.
+        Stages may nest; each records only the time not spent in the
+        stages inside it, so the stages of a request add up to its total.
+        Timing state lives in the current context, not on the instance, so
+        one decorated function may run on many threads at once.
+        """
+        self.name = name
+
+    def __enter__(self):
+        _nested.set([0.0, time.perf_counter(), _nested.get()])
+        return self
+
+    def __exit__(self, *exc):
+        inner, start, outer = _nested.get()
+        elapsed = time.perf_counter() - start
+        _nested.set(outer)
+        if outer is not None:
+            outer[0] += elapsed
+        stages = _stages.get()
+        if stages is not None:
+            stages[self.name] = stages.get(self.name, 0.0) + elapsed - inner
+        return False
+
+
+def _endpoint():
+    if request.path.endswith('/_dash-update-component'):
+        body = request.get_json(silent=True) or {}
+        return f"callback:{body.get('output', '?')}"
+    if request.url_rule is not None:
+        return request.url_rule.rule
+    return 'unmatched'
+
+
+def _start_profile():
+    mode = request.headers.get(PROFILE_HEADER)
+    if not mode and PROFILE_SAMPLE_RATE and os.urandom(1)[0] < PROFILE_SAMPLE_RATE * 256:
+        mode = 'cprofile'
+    if not mode or not _profile_lock.acquire(blocking=False):
+        return None
+    if mode == 'pyinstrument' and pyinstrument is not None:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+
+def _stop_profile(profiler, app_name):
+    try:
+        name = f"{app_name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{threading.get_ident()}"
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            filename = os.path.join(PROFILE_DIR, f'{name}.prof')
+            profiler.dump_stats(filename)
+        else:
+            profiler.stop()
+            filename = os.path.join(PROFILE_DIR, f'{name}.html')
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        return filename
+    finally:
+        _profile_lock.release()
+
+
+def instrument_server(server, app_name):
+    """
+    Record latency, response size and stage timings of every request to a
+    Flask ``server`` (a Dash app's server or the main app).
+    """
+    if not METRICS or getattr(server, '_instrumented', False):
+        return server
+    server._instrumented = True
+
+    @server.before_request
+    def _before():
+        g._metrics_start = time.perf_counter()
+        g._metrics_stages = {}
+        g._metrics_token = _stages.set(g._metrics_stages)
+        g._metrics_profiler = _start_profile() if PROFILING else None
+
+    @server.after_request
+    def _after(response):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return response
+        profiler = g.pop('_metrics_profiler', None)
+        if profiler is not None:
+            response.headers['X-Profile-File'] = _stop_profile(profiler, app_name)
+
+        elapsed = time.perf_counter() - start
+        endpoint = _endpoint()
+        stages = g.pop('_metrics_stages')
+        _stages.reset(g.pop('_metrics_token'))
+        if stages:
+            stages['other'] = max(elapsed - sum(stages.values()), 0.0)
+        for name, seconds in stages.items():
+            metrics.stage_seconds.observe(seconds, app_name, endpoint, name)
+        metrics.request_seconds.observe(elapsed, app_name, endpoint, str(response.status_code))
+
+        size = response.content_length
+        if size is None and not response.is_streamed:
+            size = len(response.get_data())
+        if size is not None:
+            metrics.response_bytes.observe(size, app_name, endpoint)
+
+        timings = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in stages.items()]
+        response.headers['Server-Timing'] = ', '.join(timings + [f'total;dur={elapsed * 1000:.2f}'])
+        return response
+
+    return server
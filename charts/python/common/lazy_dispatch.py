@@ -0,0 +1,131 @@
+# charts/python/common/lazy_dispatch.py
+
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+from collections.abc import Mapping
+
+from charts.python.common.registry import DATASETS, data_version, tracking
+
+# === Config ===
+# Import mounted Dash apps on the first request to their prefix.
+LAZY_MOUNTS = os.environ.get('LAZY_MOUNTS', '1') == '1'
+# Import every mount in a background thread right after startup.
+PREWARM_MOUNTS = os.environ.get('PREWARM_MOUNTS', '0') == '1'
+
+
+class LazyMounts(Mapping):
+    def __init__(self, modules, attribute='server', on_load=None):
+        """
+        Prefix -> WSGI app mapping for DispatcherMiddleware that imports
+        each app's module the first time its prefix is requested.
+        Parameters
+        ----------
+        modules : dict
+            Mount prefix -> dotted module path.
+        attribute : str, default: 'server'
+            Name of the WSGI app inside each module.
+        on_load : callable, optional
+            Called as ``on_load(app, prefix)`` once per mount after import.
+        """
+        self.modules = dict(modules)
+        self.attribute = attribute
+        self.on_load = on_load
+        self.timings = {}
+        self.datasets = {}
+        self._apps = {}
+        self._locks = {prefix: threading.Lock() for prefix in self.modules}
+
+    def __getitem__(self, prefix):
+        app = self._apps.get(prefix)
+        if app is not None:
+            return app
+        with self._locks[prefix]:
+            app = self._apps.get(prefix)
+            if app is None:
+                _, app = self._import(prefix, importlib.import_module)
+                self._apps[prefix] = app
+                print(f"Mounted {prefix} in {self.timings[prefix]:.2f}s")
+            return app
+
+    def _import(self, prefix, load):
+        start = time.perf_counter()
+        with tracking() as datasets:
+            module = load(self.modules[prefix])
+            app = getattr(module, self.attribute)
+            if hasattr(app, 'config'):
+                # Figure caches key on the data the app was built from
+                app.config['DATA_VERSION'] = data_version()
+            if self.on_load is not None:
+                self.on_load(app, prefix)
+        # Imported earlier without tracking: assume it reads everything
+        self.datasets[prefix] = datasets or set(DATASETS)
+        self.timings[prefix] = time.perf_counter() - start
+        return module, app
+
+    def dependents(self, names):
+        """Loaded mounts that read any of the datasets ``names``."""
+        return [prefix for prefix in self._apps if self.datasets.get(prefix, set()) & set(names)]
+
+    def rebuild(self, prefix):
+        """
+        Import a fresh copy of the module behind ``prefix`` and return
+        ``(module, app)`` without mounting it. The app in service keeps
+        its own module globals, so it is unaffected until ``replace``.
+        """
+        def load(name):
+            spec = importlib.util.find_spec(name)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+
+        return self._import(prefix, load)
+
+    def replace(self, built, version=None):
+        """
+        Mount rebuilt apps (prefix -> (module, app)). Requests already
+        dispatched finish on the old app; ``version`` re-stamps the apps
+        that were not rebuilt because their data did not change.
+        """
+        for prefix, (module, app) in built.items():
+            sys.modules[self.modules[prefix]] = module
+            self._apps[prefix] = app
+        if version is not None:
+            for prefix, app in list(self._apps.items()):
+                if prefix not in built and hasattr(app, 'config'):
+                    app.config['DATA_VERSION'] = version
+
+    def __contains__(self, prefix):
+        return prefix in self.modules
+
+    def __iter__(self):
+        return iter(self.modules)
+
+    def __len__(self):
+        return len(self.modules)
+
+    def loaded(self, prefix):
+        return prefix in self._apps
+
+    def prewarm(self, background=True):
+        """Import every mount, in a daemon thread unless ``background`` is False."""
+        def run():
+            for prefix in self.modules:
+                try:
+                    self[prefix]
+                except Exception as e:
+                    print(f"Could not mount {prefix}: {e}")
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name='prewarm-mounts', daemon=True)
+        thread.start()
+        return thread
+
+    def report(self):
+        """Import time of every mount loaded so far, slowest first."""
+        return dict(sorted(self.timings.items(), key=lambda item: item[1], reverse=True))
@@ -0,0 +1,212 @@
+# charts/python/common/registry.py
+
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from charts.python.common.binary_cache import file_hash, read_csv
+
+# Every dataset the mounted apps read, with its country-like columns.
+DATASETS = {
+    'co2': {
+        'path': 'datasets/yearly-co2-emissions.csv',
+        'categories': ['Entity', 'Code']
+    },
+    'forest': {
+        'path': 'datasets/map_forest_area.csv',
+        'categories': ['Entity', 'Code']
+    },
+    'temperature': {
+        'path': 'datasets/yearl_temperature.csv',
+        'categories': ['Entity', 'Code']
+    },
+    'aqi': {
+        'path': 'datasets/map_air_quality.csv',
+        'categories': ['Country', 'Status']
+    },
+    'climate': {
+        'path': 'datasets/Climate_Change_Dataset.csv',
+        'categories': ['Country']
+    },
+    'pollution': {
+        'path': 'datasets/Pollution_Dataset.csv',
+        'categories': ['Country']
+    },
+    'plastic': {
+        'path': 'datasets/plastic_waste_VS_recycled..csv',
+        'categories': ['Country']
+    },
+    'population': {
+        'path': 'datasets/population.csv',
+        'categories': ['Entity']
+    },
+}
+
+_frames = {}
+_lock = threading.Lock()
+# Dataset -> content hash of the file its published frame was read from
+_hashes = {}
+# Frames and hashes visible to one thread only, see staged()
+_staged = threading.local()
+# Datasets read inside tracking() blocks, per thread
+_tracking = threading.local()
+_reload_hooks = []
+_publish_hooks = []
+
+
+def uses(*names):
+    """Record that the caller derives data from datasets ``names``."""
+    used = getattr(_tracking, 'used', None)
+    if used is not None:
+        used.update(names)
+
+
+@contextmanager
+def tracking():
+    """Collect the names of the datasets this thread reads inside the block."""
+    previous = getattr(_tracking, 'used', None)
+    used = _tracking.used = set()
+    try:
+        yield used
+    finally:
+        _tracking.used = previous
+
+
+def _read_only(df):
+    # Rebuild the frame over read-only views of its numeric and date
+    # columns, so an in-place write raises instead of changing the data
+    # every mounted app shares
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if values.dtype.kind in 'biufM':
+            values = values.to_numpy().view()
+            values.flags.writeable = False
+        columns[col] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def _load(name):
+    spec = DATASETS[name]
+    df = read_csv(spec['path'])
+    for col in spec['categories']:
+        df[col] = df[col].astype('category')
+    return _read_only(df)
+
+
+def load_frame(name):
+    """Read dataset ``name`` from disk without touching the shared frames."""
+    return _load(name)
+
+
+def get_frame(name):
+    """
+    Return the process-wide frame for dataset ``name``.
+
+    Frames are shared by every app mounted in app.py and are read-only:
+    their numeric columns reject in-place writes, so derive new frames
+    with ``assign``/slicing instead.
+    """
+    uses(name)
+    staged = getattr(_staged, 'frames', None)
+    if staged and name in staged:
+        return staged[name]
+    frame = _frames.get(name)
+    if frame is not None:
+        return frame
+    with _lock:
+        frame = _frames.get(name)
+        if frame is None:
+            content_hash(name)
+            frame = _load(name)
+            _frames[name] = frame
+        return frame
+
+
+def is_loaded(name):
+    return name in _frames
+
+
+def dataset_path(name):
+    uses(name)
+    return DATASETS[name]['path']
+
+
+def content_hash(name):
+    """
+    Hash of the file dataset ``name`` is served from; None when it is
+    missing. Each file is hashed once, so later edits on disk only show up
+    once publish() swaps in the reloaded data.
+    """
+    staged = getattr(_staged, 'hashes', None)
+    if staged and name in staged:
+        return staged[name]
+    value = _hashes.get(name)
+    if value is None and os.path.exists(DATASETS[name]['path']):
+        value = _hashes.setdefault(name, file_hash(DATASETS[name]['path']))
+    return value
+
+
+def data_version():
+    """
+    Token for the data this process serves, derived from the contents of
+    every dataset file. Cheap enough to call per request, and processes
+    serving identical files agree on it.
+    """
+    digest = hashlib.sha1()
+    for name in DATASETS:
+        value = content_hash(name)
+        if value is not None:
+            digest.update(f"{name}:{value};".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def on_reload(func):
+    """Call ``func(names)`` before anything is rebuilt from reloaded datasets."""
+    _reload_hooks.append(func)
+    return func
+
+
+def on_publish(func):
+    """Call ``func(names)`` on the reloading thread once datasets ``names`` are published."""
+    _publish_hooks.append(func)
+    return func
+
+
+def staging():
+    """Datasets this thread reads from a staged() block; empty elsewhere."""
+    return set(getattr(_staged, 'hashes', None) or ())
+
+
+@contextmanager
+def staged(frames, hashes):
+    """
+    Serve ``frames`` and their content ``hashes`` (dataset -> value) to
+    this thread only, so indexes can be built from reloaded data while
+    every other thread keeps reading the published frames.
+    """
+    for func in _reload_hooks:
+        func(set(hashes))
+    _staged.frames, _staged.hashes = frames, hashes
+    try:
+        yield
+    finally:
+        _staged.frames = _staged.hashes = None
+
+
+def publish(frames, hashes):
+    """Make reloaded ``frames`` and ``hashes`` the ones every thread reads."""
+    with _lock:
+        _frames.update(frames)
+        _hashes.update(hashes)
+    for func in _publish_hooks:
+        func(set(hashes))
+
+
+def preload(names=None):
+    """Load datasets up front, e.g. in a pre-fork master process."""
+    for name in names or DATASETS:
+        get_frame(name)
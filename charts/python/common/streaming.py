@@ -0,0 +1,141 @@
+# charts/python/common/streaming.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# === Config ===
+# Rows parsed per chunk; peak memory is one chunk plus the output buffers.
+CHUNK_ROWS = int(os.environ.get('INGEST_CHUNK_ROWS', 100_000))
+
+
+def count_rows(path, block=1 << 20):
+    """Upper bound on the data rows of a CSV: its line count minus the header."""
+    lines = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(block), b''):
+            lines += chunk.count(b'\n')
+    return max(lines, 1)
+
+
+def _downcast(values):
+    if values.dtype == np.float64:
+        return values.astype(np.float32)
+    if values.dtype.kind in 'iu' and values.dtype.itemsize > 4:
+        if len(values) == 0 or (values.min() >= np.iinfo(np.int32).min and values.max() <= np.iinfo(np.int32).max):
+            return values.astype(np.int32)
+    return values
+
+
+class _Column:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buffer = None
+
+    def reserve(self, size):
+        if size > self.capacity:
+            self.capacity = max(size, self.capacity * 2)
+            if self.buffer is not None:
+                grown = np.empty(self.capacity, dtype=self.buffer.dtype)
+                grown[:len(self.buffer)] = self.buffer
+                self.buffer = grown
+
+    def write(self, start, values):
+        if self.buffer is None:
+            self.buffer = np.empty(self.capacity, dtype=values.dtype)
+        elif not np.can_cast(values.dtype, self.buffer.dtype, 'safe'):
+            # e.g. an integer column that turns out to have missing values
+            self.buffer = self.buffer.astype(np.result_type(self.buffer.dtype, values.dtype))
+        self.buffer[start:start + len(values)] = values
+
+
+class _CategoryColumn(_Column):
+    def __init__(self, capacity):
+        super().__init__(capacity)
+        self.buffer = np.empty(capacity, dtype=np.int32)
+        self.categories = {}
+
+    def write(self, start, values):
+        codes, uniques = pd.factorize(values)
+        lookup = np.array([self.categories.setdefault(value, len(self.categories)) for value in uniques] + [-1],
+                          dtype=np.int32)
+        # factorize marks missing values with -1, the sentinel's position
+        self.buffer[start:start + len(values)] = lookup[codes]
+
+    def finish(self, size):
+        names = list(self.categories)
+        order = sorted(range(len(names)), key=names.__getitem__)
+        remap = np.empty(len(names) + 1, dtype=np.int32)
+        remap[order] = np.arange(len(names), dtype=np.int32)
+        remap[-1] = -1
+        codes = remap[self.buffer[:size]]
+        return pd.Categorical.from_codes(codes, categories=[names[i] for i in order], validate=False)
+
+
+def read_csv_chunked(path, numeric=(), dates=None, categories=(), window=None, usecols=None, chunksize=CHUNK_ROWS):
+    """
+    Read a CSV in chunks into compact columnar buffers.
+    Parameters
+    ----------
+    path : str
+        CSV to read.
+    numeric : sequence of str
+        Columns coerced to numbers; unparsable values become NaN.
+    dates : dict, optional
+        Column -> keyword arguments for pd.to_datetime.
+    categories : sequence of str
+        Columns stored as pandas categoricals (codes + sorted categories).
+    window : (column, start, end), optional
+        Keep only rows whose date ``column`` lies in [start, end].
+    usecols : list of str, optional
+        Columns to read; the rest are skipped by the parser.
+    chunksize : int
+        Rows parsed at a time.
+
+    Other numeric columns are downcast per chunk: float64 to float32 and
+    int64 to int32 when the values fit. Rows are appended into buffers
+    sized from the file's line count, or grown by doubling when a window
+    drops rows, so memory stays near the size of the kept data.
+    """
+    dates = dict(dates or {})
+    categories = set(categories)
+    upper = count_rows(path)
+    capacity = upper if window is None else min(upper, chunksize * 4)
+    columns = {}
+    header = None
+    size = 0
+
+    reader = pd.read_csv(path, chunksize=chunksize, usecols=usecols,
+                         dtype={col: str for col in categories})
+    for chunk in reader:
+        header = header or list(chunk.columns)
+        for col in numeric:
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+        for col, kwargs in dates.items():
+            chunk[col] = pd.to_datetime(chunk[col], **kwargs)
+        if window is not None:
+            col, start, end = window
+            chunk = chunk[chunk[col].between(pd.Timestamp(start), pd.Timestamp(end))]
+        if not len(chunk):
+            continue
+
+        for col in chunk.columns:
+            if col not in columns:
+                columns[col] = _CategoryColumn(capacity) if col in categories else _Column(capacity)
+            column = columns[col]
+            column.reserve(size + len(chunk))
+            values = chunk[col].to_numpy() if col in categories else _downcast(chunk[col].to_numpy())
+            column.write(size, values)
+        size += len(chunk)
+
+    data = {}
+    for col in header or []:
+        column = columns.get(col)
+        if column is None:
+            data[col] = np.empty(0)
+        elif isinstance(column, _CategoryColumn):
+            data[col] = column.finish(size)
+        else:
+            data[col] = column.buffer[:size]
+    return pd.DataFrame(data, copy=False)
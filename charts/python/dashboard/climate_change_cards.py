@@ -1,9 +1,12 @@
 import pandas as pd
 from datetime import datetime
 
-def calculate_global_temp_stats():
+from charts.python.common.registry import get_frame
+
+def calculate_global_temp_stats(temp_df=None):
     try:
-        temp_df = pd.read_csv('datasets/yearl_temperature.csv')
+        if temp_df is None:
+            temp_df = get_frame('temperature')
         
         temp_1940 = temp_df[temp_df['year'] == 1940]['Average surface temperature'].mean()
         temp_2024 = temp_df[temp_df['year'] == 2024]['Average surface temperature'].mean()
@@ -24,9 +27,10 @@ def calculate_global_temp_stats():
             'percentage_increase': "N/A"
         }
 
-def calculate_co2_stats():
+def calculate_co2_stats(co2_df=None):
     try:
-        co2_df = pd.read_csv('datasets/yearly-co2-emissions.csv')
+        if co2_df is None:
+            co2_df = get_frame('co2')
         
         co2_1949 = co2_df[co2_df['Year'] == 1949]['Annual CO₂ emissions'].sum()
         co2_2023 = co2_df[co2_df['Year'] == 2023]['Annual CO₂ emissions'].sum()
@@ -44,11 +48,12 @@ def calculate_co2_stats():
             'percentage_increase': "N/A"
         }
 
-def calculate_sea_level_stats():
+def calculate_sea_level_stats(sea_df=None):
     try:
-        sea_df = pd.read_csv('datasets/Climate_Change_Dataset.csv')
+        if sea_df is None:
+            sea_df = get_frame('climate')
         
-        sea_df.columns = sea_df.columns.str.strip()
+        sea_df = sea_df.rename(columns=str.strip)
         if 'Sea Level Rise (mm)' not in sea_df.columns:
             sea_df = pd.read_csv('datasets/Climate_Change_Dataset.csv', header=None, 
                                 names=['Year', 'Country', 'Sea Level Rise (mm)'])
@@ -69,11 +74,10 @@ def calculate_sea_level_stats():
             'increase': "N/A"
         }
 
-def calculate_population_stats():
-    file_path = 'datasets/population.csv'
-    
-    pop_df = pd.read_csv(file_path)
-    pop_df.columns = pop_df.columns.str.strip()
+def calculate_population_stats(pop_df=None):
+    if pop_df is None:
+        pop_df = get_frame('population')
+    pop_df = pop_df.rename(columns=str.strip)
     
     pop_col = None
     for col in pop_df.columns:
@@ -144,8 +148,9 @@ def generate_html():
     
     return html_template
 
-html_output = generate_html()
-with open('card_output.html', 'w', encoding='utf-8') as f:
-    f.write(html_output)
+if __name__ == '__main__':
+    html_output = generate_html()
+    with open('card_output.html', 'w', encoding='utf-8') as f:
+        f.write(html_output)
 
-print("HTML file generated successfully!")
\ No newline at end of file
+    print("HTML file generated successfully!")
@@ -0,0 +1,87 @@
+# charts/python/dashboard/stats_service.py
+
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+
+from charts.python.common.registry import dataset_path, get_frame, load_frame
+from charts.python.dashboard.climate_change_cards import (
+    calculate_global_temp_stats,
+    calculate_co2_stats,
+    calculate_sea_level_stats,
+    calculate_population_stats
+)
+
+# Stat card -> (dataset it is computed from, calculation)
+CARDS = {
+    'temperature': ('temperature', calculate_global_temp_stats),
+    'co2': ('co2', calculate_co2_stats),
+    'sea_level': ('climate', calculate_sea_level_stats),
+    'population': ('population', calculate_population_stats),
+}
+
+
+def file_signature(path):
+    """(mtime_ns, size) of ``path``, or None when it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class StatsService:
+    def __init__(self, cards=CARDS):
+        """
+        Dashboard stat cards memoized on the modification time of their
+        source files. A card is recomputed only when its own dataset
+        changed; the other cards keep their cached values.
+        Parameters
+        ----------
+        cards : dict
+            Card name -> (dataset name, function taking that dataset's frame).
+        """
+        self.cards = cards
+        self._results = {}
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def signatures(self):
+        return {
+            name: file_signature(dataset_path(dataset))
+            for name, (dataset, _) in self.cards.items()
+        }
+
+    def version(self):
+        """
+        Return ``(etag, last_modified)`` of the current data. Only stats the
+        source files, so conditional requests never compute anything.
+        """
+        signatures = self.signatures()
+        etag = hashlib.sha1(repr(sorted(signatures.items())).encode('utf-8')).hexdigest()[:16]
+        mtimes = [sig[0] for sig in signatures.values() if sig is not None]
+        last_modified = datetime.fromtimestamp(max(mtimes) / 1e9, tz=timezone.utc) if mtimes else None
+        return etag, last_modified
+
+    def _frame(self, dataset, signature):
+        # The shared registry frame is only valid for the file it was read
+        # from; a newer file is read on its own.
+        first = self._loaded.setdefault(dataset, signature)
+        if signature == first:
+            return get_frame(dataset)
+        return load_frame(dataset)
+
+    def get(self):
+        """Return every card's stats, recomputing only the stale ones."""
+        signatures = self.signatures()
+        with self._lock:
+            for name, (dataset, calculate) in self.cards.items():
+                cached = self._results.get(name)
+                if cached is not None and cached[0] == signatures[name]:
+                    continue
+                self._results[name] = (signatures[name], calculate(self._frame(dataset, signatures[name])))
+            return {name: self._results[name][1] for name in self.cards}
+
+
+stats_service = StatsService()
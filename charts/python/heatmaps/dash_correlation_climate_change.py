@@ -6,12 +6,26 @@ import plotly.express as px
 from dash import Dash, dcc, html, Input, Output
 import dash_bootstrap_components as dbc
 
+from charts.python.common.registry import get_frame
+from charts.python.common.correlation import RangeCorrelation
+from charts.python.common.datastore import partitioned
+from charts.python.common.figure_cache import figure_cache
+from charts.python.common.instrumentation import stage
+
 # Load and prepare data
-df = pd.read_csv('datasets/Climate_Change_Dataset.csv')
+store = partitioned('climate', lambda: get_frame('climate'), 'Year')
+df = store.frame
 
 numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
 numeric_cols = [col for col in numeric_cols if col not in ['Year']]
 
+aggregated_df = (
+    df.dropna(subset=numeric_cols)
+    .groupby(['Year', 'Country'], observed=True)[numeric_cols].mean()
+    .reset_index()
+)
+correlation = RangeCorrelation(aggregated_df, 'Year', numeric_cols)
+
 # Initialize Dash app with specific path prefix for mounting
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], requests_pathname_prefix='/climate/')
 server = app.server
@@ -58,15 +72,9 @@ app.layout = dbc.Container([
     ])
 ], fluid=True)
 
-@app.callback(
-    Output('correlation-heatmap', 'figure'),
-    Input('year-slider', 'value')
-)
-def update_heatmap(year_range):
-    filtered_df = df[(df['Year'] >= year_range[0]) & (df['Year'] <= year_range[1])]
-    filtered_df = filtered_df.dropna(subset=numeric_cols)
-    aggregated_df = filtered_df.groupby(['Year', 'Country'])[numeric_cols].mean().reset_index()
-    corr_matrix = aggregated_df[numeric_cols].corr()
+def build_heatmap(year_range):
+    with stage('filter'):
+        corr_matrix = correlation.corr(year_range[0], year_range[1])
 
     fig = px.imshow(
         corr_matrix,
@@ -89,3 +97,10 @@ def update_heatmap(year_range):
     fig.update_xaxes(tickangle=45)
     fig.update_traces(hovertemplate="<b>%{y}</b> vs <b>%{x}</b><br>Correlation: %{z:.2f}<extra></extra>")
     return fig
+
+@app.callback(
+    Output('correlation-heatmap', 'figure'),
+    Input('year-slider', 'value')
+)
+def update_heatmap(year_range):
+    return figure_cache.get_or_build('climate', (int(year_range[0]), int(year_range[1])), build_heatmap)
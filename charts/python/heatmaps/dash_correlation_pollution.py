@@ -4,15 +4,29 @@ import plotly.express as px
 from dash import Dash, dcc, html, Input, Output
 import dash_bootstrap_components as dbc
 
-df = pd.read_csv('datasets/Pollution_Dataset.csv')
+from charts.python.common.registry import get_frame
+from charts.python.common.correlation import RangeCorrelation
+from charts.python.common.datastore import partitioned
+from charts.python.common.figure_cache import figure_cache
+from charts.python.common.instrumentation import stage
 
-df['Date'] = pd.to_datetime(df['Date'], format='%d/%m/%Y', errors='coerce')
-df['Year'] = df['Date'].dt.year
+def load_data():
+    # Unparsable dates have no year to be grouped under
+    df = get_frame('pollution').dropna(subset=['Date'])
+    return df.assign(Year=df['Date'].dt.year.astype('int16'))
+
+store = partitioned('pollution', load_data, 'Year')
+df = store.frame
 
 # Exclude non-numeric columns for correlation
 numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
 numeric_cols = [col for col in numeric_cols if col not in ['Year']]
 
+# Yearly means (to reduce daily noise) are independent of the selected range,
+# so their correlation statistics are accumulated once per year
+yearly_df = df.dropna(subset=numeric_cols).groupby('Year')[numeric_cols].mean().reset_index()
+correlation = RangeCorrelation(yearly_df, 'Year', numeric_cols)
+
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], requests_pathname_prefix="/dash/")
 server = app.server 
 
@@ -58,22 +72,10 @@ app.layout = dbc.Container([
     ])
 ], fluid=True)
 
-@app.callback(
-    Output('correlation-heatmap', 'figure'),
-    Input('year-slider', 'value')
-)
-def update_heatmap(year_range):
-    # Filter data by year range
-    filtered_df = df[(df['Year'] >= year_range[0]) & (df['Year'] <= year_range[1])]
-
-    # Drop rows with NaNs in relevant numeric columns
-    filtered_df = filtered_df.dropna(subset=numeric_cols)
-
-    # Group by year and aggregate using mean to reduce daily noise
-    aggregated_df = filtered_df.groupby('Year')[numeric_cols].mean().reset_index()
-
-    # Compute correlation matrix
-    corr_matrix = aggregated_df[numeric_cols].corr()
+def build_heatmap(year_range):
+    # Compute correlation matrix from the precomputed yearly statistics
+    with stage('filter'):
+        corr_matrix = correlation.corr(year_range[0], year_range[1])
 
     # Create heatmap
     fig = px.imshow(
@@ -95,9 +97,16 @@ def update_heatmap(year_range):
         coloraxis_colorbar=dict(title="Correlation"),
         font=dict(size=10)
     )
-    
+
     fig.update_xaxes(tickangle=45)
     fig.update_traces(hovertemplate="<b>%{y}</b> vs <b>%{x}</b><br>Correlation: %{z:.2f}<extra></extra>")
-    
+
     return fig
 
+@app.callback(
+    Output('correlation-heatmap', 'figure'),
+    Input('year-slider', 'value')
+)
+def update_heatmap(year_range):
+    return figure_cache.get_or_build('pollution', (int(year_range[0]), int(year_range[1])), build_heatmap)
+
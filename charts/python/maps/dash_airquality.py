@@ -1,10 +1,21 @@
 # charts/python/dash_aqi_map.py
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from dash import Dash, dcc, html, Input, Output
+from dash.exceptions import PreventUpdate
 from datetime import datetime
 
+from charts.python.common.registry import get_frame
+from charts.python.common.choropleth import ChoroplethTemplate, FAST_FIGURES
+from charts.python.common.countries import ISO3_COL, name_hover, resolve, with_iso3
+from charts.python.common.coalesce import PAGE_STATE, coalesced, install_page_id
+from charts.python.common.cube import FREQUENCIES, REDUCTIONS, DateCube
+from charts.python.common.clientside import CLIENTSIDE_MAPS, BUNDLE_STORE_ID, build_bundle, register_clientside_map, register_server_map
+from charts.python.common.datastore import partitioned
+from charts.python.common.figure_cache import figure_cache, PREWARM
+
 DATA_FILE = "datasets/map_air_quality.csv"
 
 DATE_COL = 'Date'
@@ -15,6 +26,23 @@ AQI_COL = 'AQI Value'
 MIN_AQI = 0
 MAX_AQI = 500
 
+# Upper AQI bound of each status, used to label aggregated values
+STATUS_BINS = [50, 100, 150, 200, 300]
+STATUS_LABELS = ['Good', 'Moderate', 'Unhealthy for Sensitive Groups', 'Unhealthy', 'Very Unhealthy', 'Hazardous']
+
+RESOLUTIONS = [
+    {'label': ' Daily', 'value': 'daily'},
+    {'label': ' Weekly', 'value': 'weekly'},
+    {'label': ' Monthly', 'value': 'monthly'},
+    {'label': ' Yearly', 'value': 'yearly'}
+]
+STATS = [
+    {'label': ' Mean', 'value': 'mean'},
+    {'label': ' Max', 'value': 'max'},
+    {'label': ' 95th percentile', 'value': 'p95'}
+]
+PERIOD_FORMATS = {'weekly': 'week of %Y-%m-%d', 'monthly': '%B %Y', 'yearly': '%Y'}
+
 COLOR_SCALE = [
     [0.0, "#00E400"],
     [0.1, "#FFFF00"],
@@ -25,24 +53,32 @@ COLOR_SCALE = [
 ]
 
 # Load and clean data
-df = pd.read_csv(DATA_FILE)
-df[DATE_COL] = pd.to_datetime(df[DATE_COL])
-df[AQI_COL] = pd.to_numeric(df[AQI_COL], errors='coerce')
-df = df[
-    (df[DATE_COL] >= pd.to_datetime('2022-07-21')) &
-    (df[DATE_COL] <= pd.to_datetime('2025-05-08'))
-]
+def load_data():
+    # Typed, and limited to 2022-07-21..2025-05-08, while streaming the CSV
+    # into the dataset cache (see binary_cache.DATASET_TYPES)
+    return with_iso3(get_frame('aqi'), COUNTRY_COL)
+
+store = partitioned('aqi', load_data, DATE_COL)
+
+# Dense (date x country) AQI matrix for the aggregated views
+cube = DateCube(store.frame, DATE_COL, COUNTRY_COL, AQI_COL)
 
 # Initialize Dash
 app = Dash(__name__, requests_pathname_prefix='/aqi/')
 server = app.server
 
-unique_dates = sorted(df[DATE_COL].unique())
+unique_dates = [pd.Timestamp(date) for date in store.keys]
 min_date = unique_dates[0]
 max_date = unique_dates[-1]
 
 app.layout = html.Div([
     html.H1("Global Air Quality Index (AQI) Map", className='header'),
+    html.Div([
+        dcc.RadioItems(id='aqi-resolution', options=RESOLUTIONS, value='daily', inline=True,
+                       inputStyle={'marginLeft': '12px'}),
+        dcc.RadioItems(id='aqi-stat', options=STATS, value='mean', inline=True,
+                       inputStyle={'marginLeft': '12px'}, style={'display': 'none'})
+    ], style={'textAlign': 'center', 'marginBottom': '10px'}),
     html.Div([
         dcc.Slider(
             id='date-slider',
@@ -54,28 +90,36 @@ app.layout = html.Div([
             tooltip={"placement": "bottom", "always_visible": True},
             updatemode='drag'
         )
-    ], className='slider-container'),
-    dcc.Graph(id='aqi-map', className='map-container')
+    ], id='date-controls', className='slider-container'),
+    dcc.Graph(id='aqi-map', className='map-container'),
+    html.Div([
+        dcc.Slider(
+            id='period-slider',
+            min=0,
+            max=0,
+            value=0,
+            marks=None,
+            step=1,
+            tooltip={"placement": "bottom", "always_visible": True}
+        )
+    ], id='period-controls', className='slider-container', style={'display': 'none'}),
+    dcc.Graph(id='period-map', className='map-container', style={'display': 'none'})
 ], className='main-container')
 
-@app.callback(
-    Output('aqi-map', 'figure'),
-    Input('date-slider', 'value')
-)
 def update_map(selected_date_idx: int):
-    selected_date = unique_dates[selected_date_idx]
-    filtered_df = df[df[DATE_COL] == selected_date]
+    return figure_cache.get_or_build('aqi', int(selected_date_idx), build_figure)
 
+def make_figure(filtered_df, title):
     fig = px.choropleth(
         filtered_df,
-        locations=COUNTRY_COL,
+        locations=ISO3_COL,
         color=AQI_COL,
         hover_name=COUNTRY_COL,
-        hover_data={AQI_COL: ':.0f', STATUS_COL: True},
-        title=f'Global Air Quality Index on {selected_date.strftime("%Y-%m-%d")}',
+        hover_data={AQI_COL: ':.0f', STATUS_COL: True, ISO3_COL: False},
+        title=title,
         color_continuous_scale=COLOR_SCALE,
         projection='natural earth',
-        locationmode='country names',
+        locationmode='ISO-3',
         range_color=[MIN_AQI, MAX_AQI]
     )
 
@@ -111,4 +155,104 @@ def update_map(selected_date_idx: int):
 
     )
 
-    return fig
+    return name_hover(fig, COUNTRY_COL)
+
+template = ChoroplethTemplate(
+    make_figure(store.slice_at(0), ''),
+    locations=ISO3_COL,
+    color=AQI_COL,
+    hover_name=COUNTRY_COL,
+    customdata=[AQI_COL, STATUS_COL]
+)
+
+def map_title(selected_date_idx: int):
+    selected_date = unique_dates[selected_date_idx]
+    return f'Global Air Quality Index on {selected_date.strftime("%Y-%m-%d")}'
+
+def build_figure(selected_date_idx: int):
+    filtered_df = store.slice_at(selected_date_idx)
+    title = map_title(selected_date_idx)
+    if FAST_FIGURES:
+        return template.render(filtered_df, title)
+    return make_figure(filtered_df, title)
+
+if PREWARM:
+    figure_cache.warm('aqi', range(len(unique_dates)), build_figure)
+
+if CLIENTSIDE_MAPS:
+    titles = [map_title(key) for key in range(len(unique_dates))]
+    app.layout.children.append(dcc.Store(id=BUNDLE_STORE_ID, data=build_bundle(store, template, titles)))
+    register_clientside_map(app, 'aqi-map', 'date-slider')
+else:
+    register_server_map(app, 'aqi-map', 'date-slider', update_map, 0)
+
+
+def period_status(values):
+    return np.asarray(STATUS_LABELS, dtype=object)[np.searchsorted(STATUS_BINS, values, side='left')]
+
+def period_title(resolution, how, pos):
+    labels, _ = cube.resample(resolution, how)
+    stat = {'mean': 'Mean', 'max': 'Maximum', 'p95': '95th percentile'}[how]
+    return f'{stat} Air Quality Index, {labels[pos].strftime(PERIOD_FORMATS[resolution])}'
+
+def build_period_figure(key):
+    resolution, how, pos = key
+    _, matrix = cube.resample(resolution, how)
+    values = matrix[pos]
+    present = ~np.isnan(values)
+    # AQI values are whole numbers; aggregates are rounded to match
+    aqi = np.rint(values[present])
+    countries = cube.locations[present]
+    filtered_df = pd.DataFrame({
+        COUNTRY_COL: countries,
+        ISO3_COL: resolve(countries),
+        AQI_COL: aqi,
+        STATUS_COL: period_status(aqi)
+    })
+    return template.render(filtered_df, period_title(resolution, how, pos))
+
+app.clientside_callback(
+    """
+    function(resolution) {
+        var hidden = {display: 'none'};
+        return resolution === 'daily'
+            ? [{}, {}, hidden, hidden, hidden]
+            : [hidden, hidden, {}, {}, {display: 'inline-block'}];
+    }
+    """,
+    Output('date-controls', 'style'),
+    Output('aqi-map', 'style'),
+    Output('period-controls', 'style'),
+    Output('period-map', 'style'),
+    Output('aqi-stat', 'style'),
+    Input('aqi-resolution', 'value')
+)
+
+@app.callback(
+    Output('period-slider', 'max'),
+    Output('period-slider', 'value'),
+    Input('aqi-resolution', 'value')
+)
+def update_period_slider(resolution):
+    if resolution not in FREQUENCIES:
+        raise PreventUpdate
+    labels, _ = cube.periods(resolution)
+    return len(labels) - 1, 0
+
+def update_period_map(resolution, how, pos):
+    # Daily, unknown or negative inputs (e.g. from a crafted request) render nothing
+    if (resolution not in FREQUENCIES or how not in REDUCTIONS
+            or not isinstance(pos, (int, float)) or not 0 <= pos < float('inf')):
+        raise PreventUpdate
+    labels, _ = cube.periods(resolution)
+    pos = min(int(pos), len(labels) - 1)
+    return figure_cache.get_or_build('aqi-period', (resolution, how, pos), build_period_figure)
+
+install_page_id(app)
+app.callback(
+    Output('period-map', 'figure'),
+    Input('aqi-resolution', 'value'),
+    Input('aqi-stat', 'value'),
+    Input('period-slider', 'value'),
+    PAGE_STATE
+)(coalesced(update_period_map))
@@ -1,16 +1,27 @@
 import pandas as pd
 import plotly.express as px
-from dash import Dash, dcc, html, Input, Output
+from dash import Dash, dcc, html
 import numpy as np
 
+from charts.python.common.registry import get_frame
+from charts.python.common.animation import register_play_mode
+from charts.python.common.choropleth import ChoroplethTemplate, FAST_FIGURES
+from charts.python.common.countries import ISO3_COL, name_hover, with_iso3
+from charts.python.common.clientside import CLIENTSIDE_MAPS, BUNDLE_STORE_ID, build_bundle, register_clientside_map, register_server_map
+from charts.python.common.datastore import partitioned
+from charts.python.common.figure_cache import figure_cache, PREWARM
+
 DATA_FILE = "datasets/yearly-co2-emissions.csv"
-df = pd.read_csv(DATA_FILE)
 
-# Clean and preprocess
-df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-df['Annual CO₂ emissions'] = pd.to_numeric(df['Annual CO₂ emissions'], errors='coerce')
-df = df.dropna(subset=['Year', 'Annual CO₂ emissions'])
-df['Log Emissions'] = np.log10(df['Annual CO₂ emissions'].replace(0, np.nan))
+def load_data():
+    # Year and emissions are parsed as numeric by the dataset cache
+    df = get_frame('co2')
+
+    # Clean and preprocess
+    df = with_iso3(df.dropna(subset=['Year', 'Annual CO₂ emissions']), 'Entity')
+    return df.assign(**{'Log Emissions': np.log10(df['Annual CO₂ emissions'].replace(0, np.nan))})
+
+store = partitioned('co2', load_data, 'Year')
 
 MIN_EMISSIONS = 0
 MAX_EMISSIONS = 10_000_000_000
@@ -45,8 +56,8 @@ TICKTEXTS = ['0', '3m', '10m', '30m', '100m', '300m', '1b', '3b', '10b']
 app = Dash(__name__, requests_pathname_prefix='/co2/')
 server = app.server
 
-min_year = int(df['Year'].min())
-max_year = int(df['Year'].max())
+min_year = int(store.keys[0])
+max_year = int(store.keys[-1])
 
 app.layout = html.Div([
     html.H1("Global CO₂ Emissions Map", className='header'),
@@ -60,29 +71,25 @@ app.layout = html.Div([
             step=1,
             tooltip={"placement": "bottom", "always_visible": True}
         )
-    ], className='slider-container'),
+    ], id='year-controls', className='slider-container'),
     dcc.Graph(id='emissions-map', className='map-container'),
 ])
 
-@app.callback(
-    Output('emissions-map', 'figure'),
-    Input('year-slider', 'value')
-)
 def update_map(selected_year: int):
-    filtered_df = df[df['Year'] == selected_year].copy()
-    filtered_df['Log Emissions'] = np.log10(filtered_df['Annual CO₂ emissions'].replace(0, np.nan))
+    return figure_cache.get_or_build('co2', int(selected_year), build_figure)
 
+def make_figure(filtered_df, title):
     fig = px.choropleth(
         filtered_df,
-        locations='Entity',
-        locationmode='country names',
+        locations=ISO3_COL,
+        locationmode='ISO-3',
         color='Log Emissions',
         hover_name='Entity',
-        hover_data={'Annual CO₂ emissions': ':,.0f', 'Code': True},
+        hover_data={'Annual CO₂ emissions': ':,.0f', 'Code': True, ISO3_COL: False},
         color_continuous_scale=COLOR_SCALE,
         range_color=[np.log10(THRESHOLDS[1]), np.log10(MAX_EMISSIONS)],
         projection='natural earth',
-        title=f"Global CO₂ Emissions in {selected_year}"
+        title=title
     )
 
     fig.update_layout(
@@ -115,4 +122,34 @@ def update_map(selected_year: int):
     )
 
 
-    return fig
+    return name_hover(fig, 'Entity')
+
+template = ChoroplethTemplate(
+    make_figure(store.slice_at(0), ''),
+    locations=ISO3_COL,
+    color='Log Emissions',
+    hover_name='Entity',
+    customdata=['Annual CO₂ emissions', 'Code']
+)
+
+def map_title(selected_year: int):
+    return f"Global CO₂ Emissions in {selected_year}"
+
+def build_figure(selected_year: int):
+    filtered_df = store.slice(selected_year)
+    title = map_title(selected_year)
+    if FAST_FIGURES:
+        return template.render(filtered_df, title)
+    return make_figure(filtered_df, title)
+
+if PREWARM:
+    figure_cache.warm('co2', range(min_year, max_year + 1), build_figure)
+
+register_play_mode(app, 'co2', store, template, map_title, 'year-controls', 'emissions-map')
+
+if CLIENTSIDE_MAPS:
+    titles = [map_title(key) for key in store.keys.tolist()]
+    app.layout.children.append(dcc.Store(id=BUNDLE_STORE_ID, data=build_bundle(store, template, titles)))
+    register_clientside_map(app, 'emissions-map', 'year-slider')
+else:
+    register_server_map(app, 'emissions-map', 'year-slider', update_map, min_year)
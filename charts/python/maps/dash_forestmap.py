@@ -1,8 +1,16 @@
 import pandas as pd
 import plotly.express as px
-from dash import Dash, dcc, html, Input, Output
+from dash import Dash, dcc, html
 import numpy as np
 
+from charts.python.common.registry import get_frame
+from charts.python.common.animation import register_play_mode
+from charts.python.common.choropleth import ChoroplethTemplate, FAST_FIGURES
+from charts.python.common.countries import with_iso3
+from charts.python.common.clientside import CLIENTSIDE_MAPS, BUNDLE_STORE_ID, build_bundle, register_clientside_map, register_server_map
+from charts.python.common.datastore import partitioned
+from charts.python.common.figure_cache import figure_cache, PREWARM
+
 DATA_FILE = "datasets/map_forest_area.csv"
 YEAR_COL = 'Year'
 COUNTRY_COL = 'Entity'
@@ -25,16 +33,19 @@ COLOR_SCALE = [
     [1.0, "#002010"]
 ]
 
-df = pd.read_csv(DATA_FILE)
-df[YEAR_COL] = pd.to_numeric(df[YEAR_COL], errors='coerce')
-df[FOREST_COL] = pd.to_numeric(df[FOREST_COL], errors='coerce')
-df = df[df[YEAR_COL].between(1990, 2020)]
+def load_data():
+    df = get_frame('forest')
+    # Drops the World aggregate, which has no map geometry
+    df = with_iso3(df[df[YEAR_COL].between(1990, 2020)], COUNTRY_COL)
+    return df.assign(**{'Log Forest': np.log10(df[FOREST_COL].replace(0, np.nan))})
+
+store = partitioned('forest', load_data, YEAR_COL)
 
 app = Dash(__name__, requests_pathname_prefix='/forest/')
 server = app.server
 
-min_year = int(df[YEAR_COL].min())
-max_year = int(df[YEAR_COL].max())
+min_year = int(store.keys[0])
+max_year = int(store.keys[-1])
 
 app.layout = html.Div([
     html.H1("Global Forest Area (1990–2020)", className='header'),
@@ -49,25 +60,21 @@ app.layout = html.Div([
             tooltip={"placement": "bottom", "always_visible": True},
             updatemode='drag'
         )
-    ], className='slider-container'),
+    ], id='year-controls', className='slider-container'),
     dcc.Graph(id='forest-map', className='map-container')
 ], className='main-container')
 
-@app.callback(
-    Output('forest-map', 'figure'),
-    Input('year-slider', 'value')
-)
 def update_map(selected_year: int):
-    filtered_df = df[df[YEAR_COL] == selected_year].copy()
-    filtered_df['Log Forest'] = np.log10(filtered_df[FOREST_COL].replace(0, np.nan))
-    
+    return figure_cache.get_or_build('forest', int(selected_year), build_figure)
+
+def make_figure(filtered_df, title):
     fig = px.choropleth(
         filtered_df,
         locations=CODE_COL,
         color='Log Forest',
         hover_name=COUNTRY_COL,
         hover_data={FOREST_COL: ':,.0f', CODE_COL: False},
-        title=f"Global Forest Area in {selected_year}",
+        title=title,
         color_continuous_scale=COLOR_SCALE,
         projection='natural earth',
         locationmode='ISO-3',
@@ -105,3 +112,33 @@ def update_map(selected_year: int):
 
     
     return fig
+
+template = ChoroplethTemplate(
+    make_figure(store.slice_at(0), ''),
+    locations=CODE_COL,
+    color='Log Forest',
+    hover_name=COUNTRY_COL,
+    customdata=[FOREST_COL, CODE_COL]
+)
+
+def map_title(selected_year: int):
+    return f"Global Forest Area in {selected_year}"
+
+def build_figure(selected_year: int):
+    filtered_df = store.slice(selected_year)
+    title = map_title(selected_year)
+    if FAST_FIGURES:
+        return template.render(filtered_df, title)
+    return make_figure(filtered_df, title)
+
+if PREWARM:
+    figure_cache.warm('forest', range(min_year, max_year + 1), build_figure)
+
+register_play_mode(app, 'forest', store, template, map_title, 'year-controls', 'forest-map')
+
+if CLIENTSIDE_MAPS:
+    titles = [map_title(key) for key in store.keys.tolist()]
+    app.layout.children.append(dcc.Store(id=BUNDLE_STORE_ID, data=build_bundle(store, template, titles)))
+    register_clientside_map(app, 'forest-map', 'year-slider')
+else:
+    register_server_map(app, 'forest-map', 'year-slider', update_map, min_year)
@@ -2,7 +2,15 @@
 
 import pandas as pd
 import plotly.express as px
-from dash import Dash, dcc, html, Input, Output
+from dash import Dash, dcc, html
+
+from charts.python.common.registry import get_frame
+from charts.python.common.animation import register_play_mode
+from charts.python.common.choropleth import ChoroplethTemplate, FAST_FIGURES
+from charts.python.common.countries import ISO3_COL, name_hover, with_iso3
+from charts.python.common.clientside import CLIENTSIDE_MAPS, BUNDLE_STORE_ID, build_bundle, register_clientside_map, register_server_map
+from charts.python.common.datastore import partitioned
+from charts.python.common.figure_cache import figure_cache, PREWARM
 
 # === Config ===
 DATA_FILE = "datasets/yearl_temperature.csv"
@@ -25,17 +33,18 @@ COLOR_SCALE = [
 ]
 
 # === Load Data ===
-df = pd.read_csv(DATA_FILE)
-df[YEAR_COL] = pd.to_numeric(df[YEAR_COL], errors='coerce')
-df[TEMP_COL] = pd.to_numeric(df[TEMP_COL], errors='coerce')
-df = df[(df[YEAR_COL] >= 1940) & (df[YEAR_COL] <= 2024)]
+def load_data():
+    df = get_frame('temperature')
+    return with_iso3(df[(df[YEAR_COL] >= 1940) & (df[YEAR_COL] <= 2024)], COUNTRY_COL)
+
+store = partitioned('temperature', load_data, YEAR_COL)
 
 # === Init Dash ===
 app = Dash(__name__, requests_pathname_prefix='/temperature/')
 server = app.server
 
-min_year = int(df[YEAR_COL].min())
-max_year = int(df[YEAR_COL].max())
+min_year = int(store.keys[0])
+max_year = int(store.keys[-1])
 
 app.layout = html.Div([
     html.H1("Global Temperature Map (1940–2024)", className='header'),
@@ -50,26 +59,24 @@ app.layout = html.Div([
             tooltip={"placement": "bottom", "always_visible": True},
             updatemode='drag'
         )
-    ], className='slider-container'),
+    ], id='year-controls', className='slider-container'),
     dcc.Graph(id='temperature-map', className='map-container'),
 ], className='main-container')
 
-@app.callback(
-    Output('temperature-map', 'figure'),
-    Input('year-slider', 'value')
-)
 def update_map(selected_year):
-    filtered_df = df[df[YEAR_COL] == selected_year]
+    return figure_cache.get_or_build('temperature', int(selected_year), build_figure)
+
+def make_figure(filtered_df, title):
     fig = px.choropleth(
         filtered_df,
-        locations=COUNTRY_COL,
+        locations=ISO3_COL,
         color=TEMP_COL,
         hover_name=COUNTRY_COL,
-        hover_data={TEMP_COL: ':.2f'},
-        title=f"Global Temperatures in {selected_year}",
+        hover_data={TEMP_COL: ':.2f', ISO3_COL: False},
+        title=title,
         color_continuous_scale=COLOR_SCALE,
         projection='natural earth',
-        locationmode='country names',
+        locationmode='ISO-3',
         range_color=[MIN_TEMP, MAX_TEMP]
     )
 
@@ -103,4 +110,34 @@ def update_map(selected_year):
     )
 
 
-    return fig
+    return name_hover(fig, COUNTRY_COL)
+
+template = ChoroplethTemplate(
+    make_figure(store.slice_at(0), ''),
+    locations=ISO3_COL,
+    color=TEMP_COL,
+    hover_name=COUNTRY_COL,
+    customdata=[TEMP_COL]
+)
+
+def map_title(selected_year):
+    return f"Global Temperatures in {selected_year}"
+
+def build_figure(selected_year):
+    filtered_df = store.slice(selected_year)
+    title = map_title(selected_year)
+    if FAST_FIGURES:
+        return template.render(filtered_df, title)
+    return make_figure(filtered_df, title)
+
+if PREWARM:
+    figure_cache.warm('temperature', range(min_year, max_year + 1), build_figure)
+
+register_play_mode(app, 'temperature', store, template, map_title, 'year-controls', 'temperature-map')
+
+if CLIENTSIDE_MAPS:
+    titles = [map_title(key) for key in store.keys.tolist()]
+    app.layout.children.append(dcc.Store(id=BUNDLE_STORE_ID, data=build_bundle(store, template, titles)))
+    register_clientside_map(app, 'temperature-map', 'year-slider')
+else:
+    register_server_map(app, 'temperature-map', 'year-slider', update_map, min_year)
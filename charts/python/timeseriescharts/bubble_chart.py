@@ -0,0 +1,139 @@
+import math
+
+import numpy as np
+
+
+class BubbleChart:
+    def __init__(self, area, bubble_spacing=0):
+        """
+        Setup for bubble collapse.
+        Parameters
+        ----------
+        area : array-like
+            Area of the bubbles.
+        bubble_spacing : float, default: 0
+            Minimal spacing between bubbles after collapsing.
+        """
+        area = np.asarray(area)
+        r = np.sqrt(area / np.pi)
+
+        self.bubble_spacing = bubble_spacing
+        self.bubbles = np.ones((len(area), 4))
+        self.bubbles[:, 2] = r
+        self.bubbles[:, 3] = area
+        self.maxstep = 2 * self.bubbles[:, 2].max() + self.bubble_spacing
+        self.step_dist = self.maxstep / 2
+
+        length = np.ceil(np.sqrt(len(self.bubbles)))
+        grid = np.arange(length) * self.maxstep
+        gx, gy = np.meshgrid(grid, grid)
+        self.bubbles[:, 0] = gx.flatten()[:len(self.bubbles)]
+        self.bubbles[:, 1] = gy.flatten()[:len(self.bubbles)]
+
+        self.com = self.center_of_mass()
+
+    def center_of_mass(self):
+        return np.average(
+            self.bubbles[:, :2], axis=0, weights=self.bubbles[:, 3]
+        )
+
+    def center_distance(self, bubble, bubbles):
+        return np.hypot(bubble[0] - bubbles[:, 0],
+                        bubble[1] - bubbles[:, 1])
+
+    def outline_distance(self, bubble, bubbles):
+        center_distance = self.center_distance(bubble, bubbles)
+        return center_distance - bubble[2] - \
+            bubbles[:, 2] - self.bubble_spacing
+
+    def check_collisions(self, bubble, bubbles):
+        distance = self.outline_distance(bubble, bubbles)
+        return len(distance[distance < 0])
+
+    def collides_with(self, bubble, bubbles):
+        distance = self.outline_distance(bubble, bubbles)
+        return np.argmin(distance, keepdims=True)
+
+    def collapse(self, n_iterations=50):
+        """
+        Move bubbles to the center of mass.
+
+        Bubbles are still moved one at a time, in the same order and by the
+        same rules as a full scan, so the packing is unchanged. Collision
+        checks only look at a per-iteration neighbour list (Verlet list):
+        every bubble moves at most ``step_dist`` per iteration, so only
+        pairs closer than ``r_i + r_j + spacing + 2 * step_dist`` at the
+        start of an iteration can collide during it. The list is built with
+        one vectorized pairwise distance pass and shrinks as the step size
+        halves.
+        Parameters
+        ----------
+        n_iterations : int, default: 50
+            Number of moves to perform.
+        """
+        n = len(self.bubbles)
+        if n < 2:
+            return
+
+        x = self.bubbles[:, 0]
+        y = self.bubbles[:, 1]
+        r = self.bubbles[:, 2]
+        weights = self.bubbles[:, 3]
+        spacing = self.bubble_spacing
+
+        # Running weighted sums keep the center of mass update O(1) per move
+        total_weight = float(weights.sum())
+        sum_x = float((x * weights).sum())
+        sum_y = float((y * weights).sum())
+        com_x, com_y = (float(v) for v in self.com)
+
+        for _i in range(n_iterations):
+            step = self.step_dist
+            reach = r[:, None] + r[None, :] + spacing + 2 * step
+            near = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :]) < reach * (1 + 1e-9)
+            np.fill_diagonal(near, False)
+            neighbours = [np.flatnonzero(row) for row in near]
+
+            moves = 0
+            for i in range(n):
+                cand = neighbours[i]
+                xi, yi, ri = float(x[i]), float(y[i]), float(r[i])
+                dx, dy = com_x - xi, com_y - yi
+                norm = math.sqrt(dx * dx + dy * dy)
+                if norm == 0:
+                    continue
+                new_x = xi + dx / norm * step
+                new_y = yi + dy / norm * step
+
+                if len(cand):
+                    distance = np.hypot(new_x - x[cand], new_y - y[cand]) - ri - r[cand] - spacing
+                    colliding = cand[np.argmin(distance)] if distance.min() < 0 else None
+                else:
+                    colliding = None
+
+                if colliding is None:
+                    moved = True
+                    moves += 1
+                else:
+                    dx, dy = float(x[colliding]) - xi, float(y[colliding]) - yi
+                    norm = math.sqrt(dx * dx + dy * dy)
+                    orth_x, orth_y = dy / norm, -dx / norm
+                    x1, y1 = xi + orth_x * step, yi + orth_y * step
+                    x2, y2 = xi - orth_x * step, yi - orth_y * step
+                    if math.hypot(com_x - x1, com_y - y1) < math.hypot(com_x - x2, com_y - y2):
+                        new_x, new_y = x1, y1
+                    else:
+                        new_x, new_y = x2, y2
+                    distance = np.hypot(new_x - x[cand], new_y - y[cand]) - ri - r[cand] - spacing
+                    moved = not (distance < 0).any()
+
+                if moved:
+                    weight = float(weights[i])
+                    sum_x += weight * (new_x - xi)
+                    sum_y += weight * (new_y - yi)
+                    x[i], y[i] = new_x, new_y
+                    com_x, com_y = sum_x / total_weight, sum_y / total_weight
+
+            self.com = np.array([com_x, com_y])
+            if moves / n < 0.1:
+                self.step_dist = self.step_dist / 2
@@ -0,0 +1,130 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from charts.python.common.binary_cache import CACHE_DIR, file_hash
+from charts.python.common.registry import dataset_path, get_frame
+from charts.python.timeseriescharts.bubble_chart import BubbleChart
+
+TOP_N = 30
+BUBBLE_SPACING = 0.1
+
+
+class YearLayout:
+    def __init__(self, entities, population, bubbles):
+        """
+        Packed bubbles of one year, largest population first.
+        Parameters
+        ----------
+        entities : array of str
+            Country names.
+        population : array of int
+            Population of each country.
+        bubbles : ndarray, shape (n, 3)
+            x, y and radius of each bubble.
+        """
+        self.entities = entities
+        self.population = population
+        self.bubbles = bubbles
+
+
+def format_population(population):
+    if population >= 1_000_000_000:
+        return f"{population/1_000_000_000:,.2f}B"
+    elif population >= 1_000_000:
+        return f"{population/1_000_000:,.2f}M"
+    elif population >= 1_000:
+        return f"{population/1_000:,.2f}K"
+    else:
+        return f"{population:,.2f}"
+
+
+def _pack(args):
+    year, population, spacing = args
+    bubble_chart = BubbleChart(area=population / 1_000_000, bubble_spacing=spacing)
+    bubble_chart.collapse()
+    return year, bubble_chart.bubbles[:, :3]
+
+
+def compute_layouts(df, top_n=TOP_N, spacing=BUBBLE_SPACING, processes=None):
+    """Pack the ``top_n`` most populous countries of every year."""
+    ranked = df.sort_values(['Year', 'population'], ascending=[True, False], kind='mergesort')
+    top = ranked.groupby('Year', sort=True).head(top_n)
+
+    jobs, meta = [], {}
+    for year, group in top.groupby('Year', sort=True):
+        year = int(year)
+        entities = group['Entity'].astype(str).to_numpy()
+        population = group['population'].to_numpy()
+        meta[year] = (entities, population)
+        jobs.append((year, population, spacing))
+
+    if processes and processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            packed = dict(pool.map(_pack, jobs))
+    else:
+        packed = dict(map(_pack, jobs))
+
+    return {year: YearLayout(*meta[year], packed[year]) for year in sorted(meta)}
+
+
+def _cache_file(path, top_n, spacing):
+    return os.path.join(CACHE_DIR, f'population-layouts-{file_hash(path)[:16]}-{top_n}-{spacing}.npz')
+
+
+def save_layouts(layouts, filename):
+    years = np.array(sorted(layouts))
+    counts = np.array([len(layouts[year].entities) for year in years])
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    tmp = f'{filename}.tmp-{os.getpid()}.npz'
+    np.savez(
+        tmp,
+        years=years,
+        counts=counts,
+        entities=np.concatenate([layouts[year].entities for year in years]).astype(str),
+        population=np.concatenate([layouts[year].population for year in years]),
+        bubbles=np.concatenate([layouts[year].bubbles for year in years])
+    )
+    os.replace(tmp, filename)
+
+
+def read_layouts(filename):
+    with np.load(filename) as data:
+        bounds = np.concatenate([[0], np.cumsum(data['counts'])])
+        return {
+            int(year): YearLayout(
+                data['entities'][bounds[i]:bounds[i + 1]],
+                data['population'][bounds[i]:bounds[i + 1]],
+                data['bubbles'][bounds[i]:bounds[i + 1]]
+            )
+            for i, year in enumerate(data['years'])
+        }
+
+
+def load_layouts(top_n=TOP_N, spacing=BUBBLE_SPACING, processes=None):
+    """
+    Return the layouts for every year, reading them from the layout cache
+    file when one exists for the current population.csv.
+    """
+    path = dataset_path('population')
+    filename = _cache_file(path, top_n, spacing)
+    if os.path.exists(filename):
+        return read_layouts(filename)
+
+    layouts = compute_layouts(get_frame('population'), top_n, spacing, processes)
+    try:
+        save_layouts(layouts, filename)
+    except OSError as e:
+        print(f"Could not write bubble layout cache {filename}: {e}")
+    return layouts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute population bubble layouts.')
+    parser.add_argument('--top-n', type=int, default=TOP_N)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    result = load_layouts(args.top_n, processes=args.processes)
+    print(f"Cached bubble layouts for {len(result)} years")
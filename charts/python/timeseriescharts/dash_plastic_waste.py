@@ -1,17 +1,33 @@
-from dash import Dash, dcc, html, Input, Output
+from dash import Dash, dcc, html, Input, Output, State
+from dash.exceptions import PreventUpdate
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import os
 
+from charts.python.common.registry import get_frame
+from charts.python.common.choropleth import typed_array
+from charts.python.common.datastore import partitioned
+from charts.python.common.downsample import downsample
+from charts.python.common.figure_cache import figure_cache
+from charts.python.common.instrumentation import stage
+
 app = Dash(__name__, requests_pathname_prefix='/plastic-waste/')
 server = app.server
 
 csv_path = os.path.join('datasets/plastic_waste_VS_recycled..csv')
 
+METRICS = {
+    'Plastic_Waste_Tons': 'red',
+    'Plastic_Recycled_Tons': '#4ECDC4'
+}
+
 try:
-    df = pd.read_csv(csv_path)
-    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
-    countries = df['Country'].unique()
+    # Rows grouped by country, each group in date order; zoom windows are
+    # found with searchsorted on the dates, whatever the CSV's row order
+    store = partitioned(
+        'plastic', lambda: get_frame('plastic').sort_values(['Country', 'Date'], kind='mergesort'), 'Country'
+    )
+    countries = store.keys
 
     app.layout = html.Div([
         html.Div([
@@ -41,59 +57,118 @@ try:
         'borderRadius': '8px'
     })
 
+    def zoom_window(relayout):
+        """(start, end) of the x range in ``relayout``, 'full' on a reset, else None."""
+        relayout = relayout or {}
+        if relayout.get('xaxis.autorange'):
+            return 'full'
+        if 'xaxis.range[0]' in relayout:
+            return relayout['xaxis.range[0]'], relayout['xaxis.range[1]']
+        if 'xaxis.range' in relayout:
+            return tuple(relayout['xaxis.range'])
+        return None
+
+    def build_graph(selected_country, window=None):
+        """
+        Waste and recycled tons of ``selected_country``, each trace reduced
+        to at most DOWNSAMPLE_POINTS points. Without a ``window`` the whole
+        series is drawn as an overview; with one, only the dates inside it
+        (plus one point on each side), so zooming in regains full detail.
+        """
+        with stage('filter'):
+            rows = store.slice(selected_country)
+            # Milliseconds since the epoch, which plotly reads as dates on a date axis
+            x = rows['Date'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+            lo, hi = 0, len(x)
+            if window is not None:
+                start, end = (pd.Timestamp(value).to_datetime64().astype('datetime64[ms]').astype(np.int64)
+                              for value in window)
+                lo = max(int(np.searchsorted(x, start, side='left')) - 1, 0)
+                hi = min(int(np.searchsorted(x, end, side='right')) + 1, len(x))
+
+        data = []
+        y_max = 0
+        for metric, color in METRICS.items():
+            y = rows[metric].to_numpy(dtype=np.float64)
+            finite = np.isfinite(y)
+            if finite.any():
+                y_max = max(y_max, float(y[finite].max()))
+            keep = lo + downsample(x[lo:hi], y[lo:hi])
+            data.append({
+                'type': 'scatter',
+                'mode': 'lines',
+                'name': metric,
+                'legendgroup': metric,
+                'x': typed_array(x[keep].astype(np.float64)),
+                'y': typed_array(y[keep]),
+                'line': {'color': color},
+                'hovertemplate': f'Metric={metric}<br>Date=%{{x}}<br>Tons=%{{y}}<extra></extra>'
+            })
+
+        if window is None and len(x):
+            window = [pd.Timestamp(x[0], unit='ms').isoformat(), pd.Timestamp(x[-1], unit='ms').isoformat()]
+
+        return {
+            'data': data,
+            'layout': {
+                'title': {'text': f'Plastic Waste vs Recycled in {selected_country}', 'x': 0.5, 'font': {'size': 18}},
+                'plot_bgcolor': '#111827',
+                'paper_bgcolor': '#111827',
+                'font': {'color': '#E5E7EB'},
+                'xaxis': {
+                    'type': 'date',
+                    'title': {'text': 'Date'},
+                    'gridcolor': 'rgba(255,255,255,0.05)',
+                    'tickfont': {'size': 12},
+                    'linecolor': 'gray',
+                    'range': window,
+                    'fixedrange': False
+                },
+                'yaxis': {
+                    'title': {'text': 'Tons of Plastic'},
+                    'gridcolor': 'rgba(255,255,255,0.05)',
+                    'tickfont': {'size': 12},
+                    # Autorange when there is nothing to scale to
+                    'range': [0, y_max * 1.1] if y_max > 0 else None,
+                    'fixedrange': False
+                },
+                'legend': {
+                    'title': {'text': 'Metric'},
+                    'orientation': 'h',
+                    'yanchor': 'bottom',
+                    'y': 1.02,
+                    'xanchor': 'right',
+                    'x': 1
+                },
+                # Keep the user's zoom when a zoomed-in figure replaces this one
+                'uirevision': selected_country,
+                'margin': {'l': 40, 'r': 40, 't': 60, 'b': 60}
+            }
+        }
+
     @app.callback(
         Output('waste-recycled-chart', 'figure'),
         Input('country-dropdown', 'value')
     )
     def update_graph(selected_country):
-        filtered_df = df[df['Country'] == selected_country]
-        y_max = max(filtered_df['Plastic_Waste_Tons'].max(), filtered_df['Plastic_Recycled_Tons'].max()) * 1.1
-        x_min, x_max = filtered_df['Date'].min(), filtered_df['Date'].max()
-
-        fig = px.line(filtered_df, 
-                      x='Date', 
-                      y=['Plastic_Waste_Tons', 'Plastic_Recycled_Tons'],
-                      title=f'Plastic Waste vs Recycled in {selected_country}',
-                      labels={'value': 'Tons', 'variable': 'Metric'},
-                      color_discrete_map={
-                          'Plastic_Waste_Tons': 'red',
-                          'Plastic_Recycled_Tons': '#4ECDC4'
-                      })
-
-        fig.update_layout(
-            plot_bgcolor='#111827',
-            paper_bgcolor='#111827',
-            font=dict(color='#E5E7EB'),
-            xaxis=dict(
-                title='Date',
-                gridcolor='rgba(255,255,255,0.05)',
-                tickfont=dict(size=12),
-                linecolor='gray',
-                range=[x_min, x_max],
-                fixedrange=False
-            ),
-            yaxis=dict(
-                title='Tons of Plastic',
-                gridcolor='rgba(255,255,255,0.05)',
-                tickfont=dict(size=12),
-                range=[0, y_max],
-                fixedrange=False
-            ),
-            title=dict(
-                x=0.5,
-                font=dict(size=18)
-            ),
-            legend=dict(
-                orientation='h',
-                yanchor='bottom',
-                y=1.02,
-                xanchor='right',
-                x=1
-            ),
-            margin=dict(l=40, r=40, t=60, b=60)
-        )
+        if selected_country is None:
+            raise PreventUpdate
+        return figure_cache.get_or_build('plastic-waste', selected_country, build_graph)
 
-        return fig
+    @app.callback(
+        Output('waste-recycled-chart', 'figure', allow_duplicate=True),
+        Input('waste-recycled-chart', 'relayoutData'),
+        State('country-dropdown', 'value'),
+        prevent_initial_call=True
+    )
+    def zoom_graph(relayout, selected_country):
+        window = zoom_window(relayout)
+        if window is None or selected_country is None:
+            # Autosize, pan mode changes and y-only zooms keep the current figure
+            raise PreventUpdate
+        if window == 'full':
+            return figure_cache.get_or_build('plastic-waste', selected_country, build_graph)
+        return build_graph(selected_country, window)
 
 except FileNotFoundError:
     app.layout = html.Div([
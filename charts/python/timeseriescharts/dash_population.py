@@ -0,0 +1,115 @@
+import numpy as np
+from dash import Dash, dcc, html, Input, Output
+from plotly.colors import sample_colorscale
+
+from charts.python.common.choropleth import typed_array
+from charts.python.common.figure_cache import figure_cache, PREWARM
+from charts.python.timeseriescharts.bubble_layouts import load_layouts, format_population, TOP_N
+
+# Bubble packings for every year, computed once and cached on disk
+layouts = load_layouts(TOP_N)
+
+years = sorted(layouts)
+min_year, max_year = min(years), max(years)
+
+# Points used to draw each bubble outline
+CIRCLE_POINTS = 64
+LABEL_MIN_RADIUS = 0.5
+
+angles = np.linspace(0, 2 * np.pi, CIRCLE_POINTS)
+unit_x, unit_y = np.cos(angles), np.sin(angles)
+colors = sample_colorscale('Viridis', np.linspace(0, 1, TOP_N).tolist())
+
+app = Dash(__name__, requests_pathname_prefix='/population/')
+server = app.server  # for DispatcherMiddleware
+
+app.layout = html.Div([
+    html.H1("World Population by Country",
+            style={'textAlign': 'center', 'fontFamily': 'Arial, sans-serif', 'marginBottom': '20px'}),
+    html.Div([
+        dcc.Slider(
+            id='year-slider',
+            min=min_year,
+            max=max_year,
+            value=min_year,
+            marks=None,
+            step=1,
+            tooltip={"placement": "bottom", "always_visible": True}
+        )
+    ], style={'width': '80%', 'margin': '0 auto 20px'}),
+    dcc.Graph(
+        id='population-chart',
+        config={'displayModeBar': False},
+        style={'height': '800px', 'width': '100%'}
+    )
+], style={'maxWidth': '1000px', 'margin': '0 auto', 'padding': '20px'})
+
+
+def build_figure(year: int):
+    """
+    Draw the packed bubbles of ``year``. Every bubble is a filled outline
+    with ``hoveron='fills'``, so plotly.js hit-tests the hover in the
+    browser and the server is only asked for a figure when the year changes.
+    """
+    layout = layouts[year]
+    bubbles = layout.bubbles
+
+    data = []
+    for i, (entity, population) in enumerate(zip(layout.entities, layout.population)):
+        x, y, r = bubbles[i]
+        data.append({
+            'type': 'scatter',
+            'mode': 'lines',
+            'x': typed_array(x + r * unit_x),
+            'y': typed_array(y + r * unit_y),
+            'fill': 'toself',
+            'fillcolor': colors[i],
+            'opacity': 0.7,
+            'line': {'width': 0, 'color': colors[i]},
+            'hoveron': 'fills',
+            'hoverinfo': 'text',
+            'text': f"{entity}<br>Population: {format_population(population)}",
+            'name': str(entity),
+            'showlegend': False
+        })
+
+    labelled = bubbles[:, 2] > LABEL_MIN_RADIUS
+    data.append({
+        'type': 'scatter',
+        'mode': 'text',
+        'x': typed_array(bubbles[labelled, 0]),
+        'y': typed_array(bubbles[labelled, 1]),
+        'text': [str(entity) for entity in layout.entities[labelled]],
+        'textfont': {'size': 10},
+        'hoverinfo': 'skip',
+        'showlegend': False
+    })
+
+    return {
+        'data': data,
+        'layout': {
+            'title': {'text': f'World Population - {year} (Top {TOP_N} Countries)', 'x': 0.5},
+            'xaxis': {'visible': False},
+            'yaxis': {'visible': False, 'scaleanchor': 'x', 'scaleratio': 1},
+            'hovermode': 'closest',
+            'plot_bgcolor': 'white',
+            'paper_bgcolor': 'white',
+            'margin': {'l': 20, 'r': 20, 't': 60, 'b': 20}
+        }
+    }
+
+
+@app.callback(
+    Output('population-chart', 'figure'),
+    Input('year-slider', 'value')
+)
+def update_chart(selected_year: int):
+    year = int(selected_year)
+    if year not in layouts:
+        # Snap to the nearest year with a precomputed layout
+        year = min(years, key=lambda y: abs(y - year))
+    return figure_cache.get_or_build('population', year, build_figure)
+
+
+if PREWARM:
+    figure_cache.warm('population', years, build_figure)
@@ -3,16 +3,20 @@ import pandas as pd
 import plotly.express as px
 import os
 
+from charts.python.common.registry import get_frame
+from charts.python.common.figure_cache import figure_cache
+from charts.python.common.instrumentation import stage
+
 app = Dash(__name__, requests_pathname_prefix='/weather-events/')
 server = app.server  # for DispatcherMiddleware
 
 csv_path = os.path.join('datasets/Climate_Change_Dataset.csv')
 
 try:
-    df = pd.read_csv(csv_path)
+    df = get_frame('climate')
 
     # Aggregate extreme weather events by country (2000–2023)
-    aggregated_df = df.groupby('Country', as_index=False)['Extreme Weather Events'].sum()
+    aggregated_df = df.groupby('Country', as_index=False, observed=True)['Extreme Weather Events'].sum()
 
     countries = aggregated_df['Country'].unique()
 
@@ -38,15 +42,12 @@ try:
         )
     ], style={'maxWidth': '1200px', 'margin': '0 auto', 'padding': '20px'})
 
-    @app.callback(
-        Output('weather-events-chart', 'figure'),
-        Input('country-dropdown', 'value')
-    )
-    def update_graph(selected_countries):
-        filtered_df = (
-            aggregated_df[aggregated_df['Country'].isin(selected_countries)]
-            if selected_countries else aggregated_df
-        )
+    def build_graph(selected_countries):
+        with stage('filter'):
+            filtered_df = (
+                aggregated_df[aggregated_df['Country'].isin(selected_countries)]
+                if selected_countries else aggregated_df
+            )
 
         y_max = filtered_df['Extreme Weather Events'].max() * 1.1 if not filtered_df.empty else 100
 
@@ -72,6 +73,13 @@ try:
 
         return fig
 
+    @app.callback(
+        Output('weather-events-chart', 'figure'),
+        Input('country-dropdown', 'value')
+    )
+    def update_graph(selected_countries):
+        return figure_cache.get_or_build('weather-events', tuple(sorted(selected_countries or ())), build_graph)
+
 except FileNotFoundError:
     app.layout = html.Div([
         html.H1("Error: File Not Found"),
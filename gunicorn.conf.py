@@ -0,0 +1,29 @@
+# gunicorn -c gunicorn.conf.py wsgi:application
+
+import multiprocessing
+import os
+
+# === Config ===
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# Threads serve the many iframe requests of one page concurrently
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+keepalive = 5
+
+# Import wsgi.py (datasets + every Dash app) once in the master and fork
+preload_app = True
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', None)
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Threads do not survive the fork; every worker watches the datasets itself
+    from charts.python.common.hot_reload import HOT_RELOAD
+    if HOT_RELOAD:
+        from app import watcher
+        watcher.start()
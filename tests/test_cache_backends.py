@@ -0,0 +1,70 @@
+# Storage rules of the figure cache backends.
+
+import os
+import sqlite3
+
+import pytest
+
+from charts.python.common.cache_backends import DiskBackend, SharedMemoryBackend
+
+SLOT = 64 * 1024
+
+
+@pytest.fixture
+def shm(tmp_path):
+    return SharedMemoryBackend(str(tmp_path / 'figures'), 64 * SLOT, slot_bytes=SLOT)
+
+
+def test_shm_round_trip_across_mappings(shm):
+    value = os.urandom(220 * 1024)
+    shm.put('co2-play|v1|(1990, 2020)', value)
+    other = SharedMemoryBackend(shm.path, 64 * SLOT, slot_bytes=SLOT)
+    assert other.get('co2-play|v1|(1990, 2020)') == value
+    assert shm.stats()['entries'] == 1
+
+
+def test_shm_lost_part_is_a_miss(shm):
+    shm.put('co2-play|v1|1', os.urandom(3 * SLOT))
+    _, key_digest = shm._digests('co2-play|v1|1', 1)
+    for index in shm._candidates(key_digest):
+        shm._write(index, (b'\0' * 8, b'\0' * 16, 0.0, 0.0, 0, 0))
+    assert shm.get('co2-play|v1|1') is None
+
+
+def test_shm_counts_dropped_values(shm):
+    shm.put('co2|v1|1', os.urandom(shm.max_value + 1))
+    assert shm.get('co2|v1|1') is None
+    assert shm.stats()['dropped'] == 1
+
+
+def test_shm_clear_by_app(shm):
+    shm.put('co2|v1|1', os.urandom(2 * SLOT))
+    shm.put('forest|v1|1', b'forest')
+    shm.clear('co2|')
+    assert shm.get('co2|v1|1') is None
+    assert shm.get('forest|v1|1') == b'forest'
+    assert shm.stats()['entries'] == 1
+
+
+def accessed(disk, key):
+    return disk._connect().execute('SELECT accessed FROM entries WHERE key = ?', (key,)).fetchone()[0]
+
+
+def test_disk_hits_touch_rarely(tmp_path):
+    disk = DiskBackend(str(tmp_path / 'figures.sqlite'), 1 << 20, touch_interval=60)
+    disk.put('co2|v1|1', b'figure')
+    stored = accessed(disk, 'co2|v1|1')
+    assert disk.get('co2|v1|1') == b'figure'
+    assert accessed(disk, 'co2|v1|1') == stored
+
+
+def test_disk_hit_does_not_wait_for_a_writer(tmp_path):
+    disk = DiskBackend(str(tmp_path / 'figures.sqlite'), 1 << 20, touch_interval=0)
+    disk.put('co2|v1|1', b'figure')
+    writer = sqlite3.connect(disk.path, isolation_level=None)
+    writer.execute('BEGIN IMMEDIATE')
+    try:
+        assert disk.get('co2|v1|1') == b'figure'
+    finally:
+        writer.execute('COMMIT')
+    assert disk.stats()['busy'] == 1
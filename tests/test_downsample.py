@@ -0,0 +1,67 @@
+# Correctness of the line-chart downsamplers.
+
+import numpy as np
+import pytest
+
+from charts.python.common.downsample import downsample, lttb, minmax
+
+
+def series(n=10_000, seed=0):
+    x = np.arange(n, dtype=np.float64) * 86_400_000
+    y = np.sin(np.arange(n) / 200) + np.random.default_rng(seed).normal(0, 0.1, n)
+    return x, y
+
+
+@pytest.mark.parametrize('threshold', [3, 10, 500, 9_999])
+def test_lttb_shape(threshold):
+    x, y = series()
+    picked = lttb(x, y, threshold)
+    assert len(picked) == threshold
+    assert picked[0] == 0 and picked[-1] == len(x) - 1
+    assert np.all(np.diff(picked) > 0)
+
+
+def test_lttb_keeps_spike():
+    x, y = series()
+    y[4321] = 50
+    assert 4321 in lttb(x, y, 200)
+
+
+@pytest.mark.parametrize('threshold', [4, 11, 500, 9_999])
+def test_minmax_shape(threshold):
+    x, y = series()
+    picked = minmax(y, threshold)
+    assert len(picked) <= threshold
+    assert picked[0] == 0 and picked[-1] == len(y) - 1
+    assert np.all(np.diff(picked) > 0)
+
+
+def test_minmax_keeps_extremes():
+    _, y = series()
+    picked = minmax(y, 100)
+    assert np.argmin(y) in picked and np.argmax(y) in picked
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_short_series_unchanged(method):
+    x, y = series(50)
+    assert np.array_equal(downsample(x, y, 100, method), np.arange(50))
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_nan_gaps_skipped(method):
+    x, y = series()
+    y[1000:3000] = np.nan
+    y[0] = np.nan
+    picked = downsample(x, y, 300, method)
+    assert len(picked) <= 300
+    assert not np.isnan(y[picked]).any()
+    assert np.all(np.diff(picked) > 0)
+    # The first and last valid points stay
+    assert picked[0] == 1 and picked[-1] == len(y) - 1
+
+
+def test_unknown_method():
+    x, y = series()
+    with pytest.raises(ValueError):
+        downsample(x, y, 100, 'median')
@@ -0,0 +1,36 @@
+import gc
+import threading
+
+from charts.python.common.registry import preload
+
+
+def create_app(preload_data=True, mount_all=True):
+    """
+    Build the WSGI application for a pre-fork server.
+
+    Datasets and mounted Dash apps are loaded here, in the master process,
+    so forked workers share them copy-on-write instead of each reading
+    every CSV again.
+    """
+    if preload_data:
+        preload()
+
+    from app import application, mounts, stats_service
+    if mount_all:
+        mounts.prewarm(background=False)
+    if preload_data:
+        stats_service.get()
+
+    # Background figure pre-warming must finish before workers fork
+    for thread in threading.enumerate():
+        if thread.name.startswith('prewarm-'):
+            thread.join()
+
+    # Keep the loaded objects out of the collector so it does not touch
+    # (and un-share) their pages in the workers
+    gc.collect()
+    gc.freeze()
+    return application
+
+
+application = create_app()